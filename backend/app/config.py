@@ -33,6 +33,14 @@ def _get_env(key: str, default=None):
 class Settings:
     # Database
     DATABASE_URL = _get_env("DATABASE_URL", "sqlite:///./test.db")
+    # asyncpg pool (app.database.pool), shared by routers, the scan queue and ComplianceEngine
+    DB_POOL_MIN_SIZE = int(_get_env("DB_POOL_MIN_SIZE", "2"))
+    DB_POOL_MAX_SIZE = int(_get_env("DB_POOL_MAX_SIZE", "10"))
+    DB_STATEMENT_CACHE_SIZE = int(_get_env("DB_STATEMENT_CACHE_SIZE", "100"))  # 0 behind a transaction-mode pooler
+    DB_MAX_INACTIVE_CONNECTION_LIFETIME_S = float(_get_env("DB_MAX_INACTIVE_CONNECTION_LIFETIME_S", "300"))
+    DB_COMMAND_TIMEOUT_S = float(_get_env("DB_COMMAND_TIMEOUT_S", "60"))     # 0 = no timeout
+    DB_HEALTHCHECK_INTERVAL_S = float(_get_env("DB_HEALTHCHECK_INTERVAL_S", "30"))  # 0 = no background ping
+    DB_HEALTHCHECK_TIMEOUT_S = float(_get_env("DB_HEALTHCHECK_TIMEOUT_S", "5"))
 
     # Models / Keys
     OPENAI_API_KEY = _get_env("OPENAI_API_KEY", "")
@@ -40,6 +48,47 @@ class Settings:
     AG2_MAX_TURNS  = int(_get_env("AG2_MAX_TURNS", "4"))
     HUGGINGFACE_TOKEN = _get_env("HUGGINGFACE_TOKEN", "")
 
+    # Embeddings (micro-batched across concurrent requests)
+    EMBED_BATCH_SIZE  = int(_get_env("EMBED_BATCH_SIZE", "32"))
+    EMBED_MAX_WAIT_MS = float(_get_env("EMBED_MAX_WAIT_MS", "5"))
+    # Embedding cache: memory LRU (bytes) + on-disk float16 store; EMBED_CACHE_PATH="" disables disk
+    EMBED_CACHE_PATH = _get_env("EMBED_CACHE_PATH", str(Path(__file__).resolve().parents[1] / ".cache" / "embeddings.sqlite"))
+    EMBED_CACHE_MAX_BYTES = int(_get_env("EMBED_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    # Verdict cache for /api/compliance/check* (utils/cache.py); TTL 0 = no expiry
+    COMPLIANCE_CACHE_SIZE = int(_get_env("COMPLIANCE_CACHE_SIZE", "500"))
+    COMPLIANCE_CACHE_TTL_S = float(_get_env("COMPLIANCE_CACHE_TTL_S", "600"))
+    COMPLIANCE_CACHE_MAX_BYTES = int(_get_env("COMPLIANCE_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+    # Shared verdict tier behind it (services/verdict_cache.py): sqlite | postgres | none
+    VERDICT_CACHE_BACKEND = (_get_env("VERDICT_CACHE_BACKEND", "sqlite") or "none").lower()
+    VERDICT_CACHE_PATH = _get_env("VERDICT_CACHE_PATH", str(Path(__file__).resolve().parents[1] / ".cache" / "verdicts.sqlite"))
+    VERDICT_CACHE_TTL_S = float(_get_env("VERDICT_CACHE_TTL_S", "86400"))
+    VERDICT_CACHE_MAX_ENTRIES = int(_get_env("VERDICT_CACHE_MAX_ENTRIES", "50000"))
+    VERDICT_VERSION_REFRESH_S = float(_get_env("VERDICT_VERSION_REFRESH_S", "30"))  # regulation_loads poll
+    # Near-duplicate verdicts (services/semantic_cache.py): cosine over query embeddings per (route, check_type)
+    SEMANTIC_CACHE = (_get_env("SEMANTIC_CACHE", "true") or "").lower() in ("1","true","yes","y")
+    SEMANTIC_CACHE_THRESHOLD = float(_get_env("SEMANTIC_CACHE_THRESHOLD", "0.97"))
+    SEMANTIC_CACHE_MAX_ENTRIES = int(_get_env("SEMANTIC_CACHE_MAX_ENTRIES", "2000"))  # per partition
+    SEMANTIC_CACHE_TTL_S = float(_get_env("SEMANTIC_CACHE_TTL_S", "3600"))
+    # Untargeted retrieval: "union" = one UNION ALL statement, "fanout" = one query per table
+    RETRIEVE_MODE = (_get_env("RETRIEVE_MODE", "union") or "union").lower()
+
+    # Lexical pre-screen (services/lexical_screen.py) before retrieval + LLM
+    LEXICAL_PRESCREEN = (_get_env("LEXICAL_PRESCREEN", "true") or "").lower() in ("1","true","yes","y")
+
+    # Skip the LLM when the best retrieved rule is below this similarity (deterministic low-risk verdict)
+    LLM_FAST_PATH = (_get_env("LLM_FAST_PATH", "true") or "").lower() in ("1","true","yes","y")
+    LLM_FAST_PATH_THRESHOLD = float(_get_env("LLM_FAST_PATH_THRESHOLD", "0.25"))
+    # Chat completion cache in AIRouter (services/llm_cache.py); LLM_CACHE_PATH="" = memory only
+    LLM_CACHE = (_get_env("LLM_CACHE", "true") or "").lower() in ("1","true","yes","y")
+    LLM_CACHE_PATH = _get_env("LLM_CACHE_PATH", str(Path(__file__).resolve().parents[1] / ".cache" / "llm_responses.sqlite"))
+    LLM_CACHE_TTL_S = float(_get_env("LLM_CACHE_TTL_S", "86400"))
+    LLM_CACHE_MAX_BYTES = int(_get_env("LLM_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+    LLM_CACHE_MAX_DISK_ENTRIES = int(_get_env("LLM_CACHE_MAX_DISK_ENTRIES", "100000"))
+
+    # Coordinator fan-out over domain agents
+    COORDINATOR_MAX_CONCURRENCY = int(_get_env("COORDINATOR_MAX_CONCURRENCY", "4"))
+    COORDINATOR_AGENT_TIMEOUT_S = float(_get_env("COORDINATOR_AGENT_TIMEOUT_S", "20"))
+
     # App
     APP_NAME = "ComplianceMonster"
     VERSION  = "0.1.0"
@@ -48,6 +97,37 @@ class Settings:
     # CORS
     CORS_ORIGINS = ["http://localhost:3000", "http://localhost:3001"]
 
+    # --- Scan queue (scan_jobs table) ---
+    SCAN_VISIBILITY_TIMEOUT_S = int(_get_env("SCAN_VISIBILITY_TIMEOUT_S", "300"))  # lease length
+    SCAN_MAX_ATTEMPTS   = int(_get_env("SCAN_MAX_ATTEMPTS", "5"))                  # then dead-lettered
+    SCAN_BACKOFF_BASE_S = float(_get_env("SCAN_BACKOFF_BASE_S", "30"))             # doubles per attempt
+    SCAN_BACKOFF_MAX_S  = float(_get_env("SCAN_BACKOFF_MAX_S", "3600"))
+    SCAN_POLL_INTERVAL_S = float(_get_env("SCAN_POLL_INTERVAL_S", "2"))
+    SCAN_WORKERS        = int(_get_env("SCAN_WORKERS", "4"))                      # consumer tasks per process
+    SCAN_DRAIN_TIMEOUT_S = float(_get_env("SCAN_DRAIN_TIMEOUT_S", "60"))          # graceful shutdown budget
+    SCAN_LANE_WEIGHTS   = _get_env("SCAN_LANE_WEIGHTS", "interactive=6,officer=3,sweep=1")  # weighted round-robin
+    SCAN_METRICS_WINDOW_S = float(_get_env("SCAN_METRICS_WINDOW_S", "3600"))      # per-lane latency window
+    SCAN_SWEEP_BATCH    = int(_get_env("SCAN_SWEEP_BATCH", "8"))                  # sweep jobs per scan_many lease (must finish within the lease)
+
+    # --- Adaptive sweep (services/sweep_scheduler.py) ---
+    SWEEP_INTERVAL_S    = float(_get_env("SWEEP_INTERVAL_S", "300"))              # how often a batch is planned
+    SWEEP_SEVERITY_HOURS = _get_env("SWEEP_SEVERITY_HOURS", "critical=6,high=12,medium=48,low=168")  # base rescan interval
+    SWEEP_DEFAULT_HOURS = float(_get_env("SWEEP_DEFAULT_HOURS", "24"))            # checked but no stored result
+    SWEEP_MAX_HOURS     = float(_get_env("SWEEP_MAX_HOURS", "720"))               # every listing at least monthly
+    SWEEP_CATEGORY_FACTORS = _get_env(                                            # JSON, lower-case category -> multiplier
+        "SWEEP_CATEGORY_FACTORS",
+        '{"supplements": 0.5, "health": 0.5, "food": 0.5, "baby": 0.5, "toys": 0.75, "beauty": 0.75, '
+        '"electronics": 1.0, "home": 1.5, "clothing": 2.0, "books": 3.0}',
+    )
+    SWEEP_REGULATION_SPREAD = float(_get_env("SWEEP_REGULATION_SPREAD", "0.25"))  # after a rule load: rescan within this fraction of the interval
+    SWEEP_TARGET_UTILIZATION = float(_get_env("SWEEP_TARGET_UTILIZATION", "0.7")) # share of worker capacity sweeps may fill
+    SWEEP_EST_SCAN_S    = float(_get_env("SWEEP_EST_SCAN_S", "8"))                # until this process has measured scans
+    SWEEP_MAX_BATCH     = int(_get_env("SWEEP_MAX_BATCH", "500"))
+
+    # Concurrency limits shared by everything in one process
+    LLM_MAX_IN_FLIGHT    = int(_get_env("LLM_MAX_IN_FLIGHT", "8"))      # concurrent OpenAI calls
+    DB_TABLE_CONCURRENCY = int(_get_env("DB_TABLE_CONCURRENCY", "4"))   # concurrent vector searches per table
+
     # --- Twilio / Alerts ---
     ENABLE_ALERTS = (_get_env("ENABLE_ALERTS", "false") or "").lower() in ("1","true","yes","y")
     TWILIO_ACCOUNT_SID = _get_env("TWILIO_ACCOUNT_SID", "")
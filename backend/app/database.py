@@ -1,8 +1,18 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import asyncpg
+from pgvector.asyncpg import register_vector
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
 
+log = logging.getLogger(__name__)
+
 # For SQLite during development (switch to Neon later)
 if settings.DATABASE_URL.startswith("sqlite"):
     engine = create_engine(settings.DATABASE_URL, connect_args={"check_same_thread": False})
@@ -17,4 +27,110 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# ---------- asyncpg pool (marketplace routers, scan queue, ComplianceEngine) ----------
+
+def _asyncpg_dsn(url: str) -> str:
+    # "postgresql+psycopg2://..." (SQLAlchemy style) -> "postgresql://..."
+    scheme, sep, rest = url.partition("://")
+    return scheme.split("+", 1)[0] + sep + rest
+
+async def _init_connection(conn: asyncpg.Connection) -> None:
+    # json/jsonb <-> Python objects: pass dicts/lists as query args, get them back decoded
+    for typename in ("json", "jsonb"):
+        await conn.set_type_codec(typename, encoder=json.dumps, decoder=json.loads, schema="pg_catalog")
+    # Binary pgvector codec: numpy arrays go over the wire as-is (no text literal / parse)
+    try:
+        await register_vector(conn)
+    except ValueError:
+        pass  # vector extension not installed in this database
+
+class _Acquire:
+    """`async with pool.acquire() as conn` that opens the pool on first use."""
+
+    def __init__(self, owner: "AsyncPool", timeout: Optional[float]):
+        self._owner = owner
+        self._timeout = timeout
+        self._ctx = None
+
+    async def __aenter__(self) -> asyncpg.Connection:
+        self._ctx = (await self._owner.open()).acquire(timeout=self._timeout)
+        return await self._ctx.__aenter__()
+
+    async def __aexit__(self, *exc):
+        return await self._ctx.__aexit__(*exc)
+
+class AsyncPool:
+    """
+    The process's single asyncpg pool. Modules import `pool` at import time; the
+    FastAPI lifespan (or scripts/worker.py) calls open()/close() around it.
+    """
+
+    def __init__(self):
+        self._pool: Optional[asyncpg.Pool] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._health_task: Optional[asyncio.Task] = None
+        self.health: Dict[str, Any] = {"ok": None, "last_ping_ms": None, "last_error": None, "checked_at": None}
+
+    async def open(self) -> asyncpg.Pool:
+        if self._pool is not None:
+            return self._pool
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # Concurrent first requests must not each build their own pool
+        async with self._lock:
+            if self._pool is None:
+                if not settings.DATABASE_URL.startswith("postgres"):
+                    raise RuntimeError("DATABASE_URL must be a postgresql:// URL for the async pool.")
+                self._pool = await asyncpg.create_pool(
+                    dsn=_asyncpg_dsn(settings.DATABASE_URL),
+                    min_size=settings.DB_POOL_MIN_SIZE,
+                    max_size=settings.DB_POOL_MAX_SIZE,
+                    statement_cache_size=settings.DB_STATEMENT_CACHE_SIZE,
+                    max_inactive_connection_lifetime=settings.DB_MAX_INACTIVE_CONNECTION_LIFETIME_S,
+                    command_timeout=settings.DB_COMMAND_TIMEOUT_S or None,
+                    init=_init_connection,
+                )
+                if settings.DB_HEALTHCHECK_INTERVAL_S > 0:
+                    self._health_task = asyncio.create_task(self._health_loop())
+        return self._pool
+
+    async def close(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await pool.close()
+
+    def acquire(self, timeout: Optional[float] = None) -> _Acquire:
+        return _Acquire(self, timeout)
+
+    async def ping(self) -> bool:
+        """SELECT 1 through the pool; result recorded in `health`."""
+        started = time.perf_counter()
+        try:
+            async with self.acquire(timeout=settings.DB_HEALTHCHECK_TIMEOUT_S) as conn:
+                await conn.fetchval("SELECT 1", timeout=settings.DB_HEALTHCHECK_TIMEOUT_S)
+        except Exception as e:
+            self.health.update(ok=False, last_error=str(e), checked_at=time.time())
+            return False
+        self.health.update(ok=True, last_ping_ms=(time.perf_counter() - started) * 1000.0,
+                           last_error=None, checked_at=time.time())
+        return True
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.DB_HEALTHCHECK_INTERVAL_S)
+            if not await self.ping():
+                log.warning("Database health check failed: %s", self.health["last_error"])
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"open": self._pool is not None, "health": dict(self.health)}
+        if self._pool is not None:
+            out.update(size=self._pool.get_size(), idle=self._pool.get_idle_size(),
+                       min_size=self._pool.get_min_size(), max_size=self._pool.get_max_size())
+        return out
+
+pool = AsyncPool()
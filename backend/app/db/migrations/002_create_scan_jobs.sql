@@ -0,0 +1,20 @@
+-- Durable scan queue (replaces the in-process asyncio.Queue in services/queue.py)
+-- Workers lease jobs with FOR UPDATE SKIP LOCKED; a lease that outlives
+-- leased_until is picked up again by another worker (visibility timeout).
+CREATE TABLE IF NOT EXISTS scan_jobs (
+  id                BIGSERIAL PRIMARY KEY,
+  listing_id        UUID NOT NULL,                     -- listings.id as used by the marketplace API
+  status            TEXT NOT NULL DEFAULT 'pending',   -- pending|running|done|dead
+  attempts          INTEGER NOT NULL DEFAULT 0,
+  max_attempts      INTEGER NOT NULL DEFAULT 5,
+  run_after         TIMESTAMPTZ NOT NULL DEFAULT NOW(), -- backoff: not leasable before this
+  leased_by         TEXT,
+  leased_until      TIMESTAMPTZ,
+  last_error        TEXT,
+  created_at        TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  updated_at        TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  finished_at       TIMESTAMPTZ
+);
+CREATE INDEX IF NOT EXISTS idx_scan_jobs_ready   ON scan_jobs (run_after, id) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_scan_jobs_leased  ON scan_jobs (leased_until) WHERE status = 'running';
+CREATE INDEX IF NOT EXISTS idx_scan_jobs_listing ON scan_jobs (listing_id, created_at DESC);
@@ -0,0 +1,19 @@
+-- Coalesce duplicate rechecks: at most ONE pending job per listing.
+-- A recheck that arrives while the listing is being scanned sets `rescan`
+-- on the running job instead of queueing a second concurrent scan.
+ALTER TABLE scan_jobs ADD COLUMN IF NOT EXISTS coalesced INTEGER NOT NULL DEFAULT 0;  -- duplicate enqueues folded into this job
+ALTER TABLE scan_jobs ADD COLUMN IF NOT EXISTS rescan    BOOLEAN NOT NULL DEFAULT FALSE;
+
+-- Fold existing duplicates before the unique index is built
+UPDATE scan_jobs k SET coalesced = k.coalesced + d.dupes
+FROM (
+  SELECT MIN(id) AS keep_id, COUNT(*) - 1 AS dupes
+  FROM scan_jobs WHERE status = 'pending'
+  GROUP BY listing_id HAVING COUNT(*) > 1
+) d
+WHERE k.id = d.keep_id;
+DELETE FROM scan_jobs a USING scan_jobs b
+WHERE a.status = 'pending' AND b.status = 'pending'
+  AND a.listing_id = b.listing_id AND a.id > b.id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_scan_jobs_pending_listing ON scan_jobs (listing_id) WHERE status = 'pending';
@@ -0,0 +1,17 @@
+-- Priority lanes: interactive (seller create/edit) > officer (manual recheck) > sweep (periodic).
+-- Workers dequeue lanes by weighted round-robin, so sweeps still drain without
+-- queueing ahead of a listing a seller is waiting on.
+ALTER TABLE scan_jobs ADD COLUMN IF NOT EXISTS lane         TEXT NOT NULL DEFAULT 'interactive';
+ALTER TABLE scan_jobs ADD COLUMN IF NOT EXISTS requested_at TIMESTAMPTZ NOT NULL DEFAULT NOW(); -- reset when promoted to a faster lane
+ALTER TABLE scan_jobs ADD COLUMN IF NOT EXISTS rescan_lane  TEXT;                              -- lane of the rescan queued behind a running job
+ALTER TABLE scan_jobs ADD COLUMN IF NOT EXISTS rescan_requested_at TIMESTAMPTZ;                 -- requested_at carried over to that rescan's job
+UPDATE scan_jobs SET requested_at = created_at WHERE requested_at > created_at;
+ALTER TABLE scan_jobs DROP CONSTRAINT IF EXISTS scan_jobs_lane_check;
+ALTER TABLE scan_jobs ADD CONSTRAINT scan_jobs_lane_check CHECK (lane IN ('interactive', 'officer', 'sweep'));
+
+-- Per-lane lease scan replaces the single ready index
+CREATE INDEX IF NOT EXISTS idx_scan_jobs_lane_ready ON scan_jobs (lane, run_after, id) WHERE status = 'pending';
+DROP INDEX IF EXISTS idx_scan_jobs_ready;
+
+-- Per-lane time-to-verdict, finished_at - requested_at (queue_metrics)
+CREATE INDEX IF NOT EXISTS idx_scan_jobs_lane_finished ON scan_jobs (lane, finished_at) WHERE status = 'done';
@@ -0,0 +1,19 @@
+-- Adaptive sweeps (services/sweep_scheduler.py): every rule ingestion records a row here,
+-- so listings last scanned before the newest regulation load become due early.
+CREATE TABLE IF NOT EXISTS regulation_loads (
+  id                BIGSERIAL PRIMARY KEY,
+  source            TEXT NOT NULL,                     -- loader script / dataset
+  rows_loaded       INTEGER NOT NULL DEFAULT 0,
+  loaded_at         TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS idx_regulation_loads_time ON regulation_loads (loaded_at DESC);
+
+-- Columns the scan path writes (listings_agent) but 001_create_marketplace.sql predates:
+-- 001 only has compliance_results.scanned_at. No-ops where the tables already have them.
+-- Listings with no last_checked_at count as never scanned and go first, `batch` at a time.
+ALTER TABLE listings           ADD COLUMN IF NOT EXISTS last_checked_at TIMESTAMPTZ;
+ALTER TABLE compliance_results ADD COLUMN IF NOT EXISTS created_at      TIMESTAMPTZ NOT NULL DEFAULT NOW();
+
+-- Candidate range scan and latest-severity lookup per listing
+CREATE INDEX IF NOT EXISTS idx_listings_last_checked ON listings (last_checked_at NULLS FIRST);
+CREATE INDEX IF NOT EXISTS idx_compliance_results_listing_created ON compliance_results (listing_id, created_at DESC);
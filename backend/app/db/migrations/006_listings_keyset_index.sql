@@ -0,0 +1,9 @@
+-- Keyset pagination for GET /products?cursor=... : WHERE (updated_at, id) < (cursor)
+-- ORDER BY updated_at DESC, id DESC walks these indexes, so page 1,000 costs the same as page 1.
+-- CONCURRENTLY: run outside a transaction block (psql -f, not wrapped in BEGIN/COMMIT).
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_listings_updated_id
+  ON listings (updated_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_listings_seller_updated_id
+  ON listings (seller_id, updated_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_listings_status_updated_id
+  ON listings (status, updated_at DESC, id DESC);
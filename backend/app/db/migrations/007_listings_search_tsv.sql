@@ -0,0 +1,11 @@
+-- Full-text search for GET /products?q=... (replaces title/description ILIKE '%q%' full scans).
+-- Generated column: Postgres keeps it current on every INSERT/UPDATE. Title outranks description.
+-- NOTE: adding a STORED generated column rewrites the table; run in a maintenance window on large tables.
+ALTER TABLE listings ADD COLUMN IF NOT EXISTS search_tsv tsvector
+  GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(description, '')), 'B')
+  ) STORED;
+
+-- CONCURRENTLY: run outside a transaction block (psql -f, not wrapped in BEGIN/COMMIT).
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_listings_search_tsv ON listings USING GIN (search_tsv);
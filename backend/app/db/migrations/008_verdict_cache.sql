@@ -0,0 +1,11 @@
+-- Shared compliance verdict cache (services/verdict_cache.py, VERDICT_CACHE_BACKEND=postgres).
+-- UNLOGGED: no WAL traffic and truncated after a crash, which is fine for a cache.
+CREATE UNLOGGED TABLE IF NOT EXISTS verdict_cache (
+  key               TEXT PRIMARY KEY,                  -- route cache key
+  version           BIGINT NOT NULL,                   -- regulation_loads id the verdict was computed under
+  value             JSONB NOT NULL,
+  expires_at        TIMESTAMPTZ NOT NULL,
+  created_at        TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+-- Size-bound prune keeps the newest rows; superseded versions are deleted with it
+CREATE INDEX IF NOT EXISTS idx_verdict_cache_created ON verdict_cache (created_at DESC);
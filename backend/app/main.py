@@ -1,4 +1,5 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from starlette.middleware.trustedhost import TrustedHostMiddleware
@@ -6,7 +7,8 @@ from contextlib import asynccontextmanager
 import logging
 
 from .config import settings
-from .database import engine, Base
+from .database import engine, Base, pool
+from .services.engine_registry import registry as engine_registry
 from .routers import products, compliance  # required
 
 logging.basicConfig(level=logging.INFO)
@@ -17,8 +19,18 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 Starting ComplianceMonster...")
     # Create tables on boot (OK for dev; switch to migrations for prod)
     Base.metadata.create_all(bind=engine)
+    # One asyncpg pool for routers, scan queue and compliance engine
+    try:
+        await pool.open()
+    except Exception as e:
+        # Keep the API up (e.g. sqlite dev DATABASE_URL); the pool is retried on first use
+        logger.warning("Async pool not opened at startup: %s", e)
+    # One embedder / AIRouter shared by every agent in this worker
+    await engine_registry.startup()
     yield
     logger.info("👋 Shutting down...")
+    await engine_registry.shutdown()
+    await pool.close()
 
 app = FastAPI(
     title=getattr(settings, "APP_NAME", "ComplianceMonster API"),
@@ -69,7 +81,15 @@ async def health():
 
 @app.get("/ready")
 async def ready():
-    return {"ok": True}
+    db_ok = await pool.ping()
+    # Probes read the status code: a worker whose pool is down must leave rotation
+    return JSONResponse({"ok": db_ok, "db": pool.stats()}, status_code=200 if db_ok else 503)
+
+@app.get("/metrics/queue")
+async def queue_metrics():
+    # Imported lazily: the scan queue needs the marketplace asyncpg pool
+    from .services.queue import queue_metrics as _queue_metrics
+    return await _queue_metrics()
 
 # ---- WebSocket (basic echo/progress stub)
 @app.websocket("/ws")
@@ -2,7 +2,7 @@ from __future__ import annotations
 from fastapi import APIRouter, HTTPException
 from uuid import uuid4, UUID
 
-from app.database import pool  # POOL NOTE
+from app.database import pool
 from app.schemas_marketplace import AppealCreate, AppealResolve
 
 router = APIRouter(prefix="/appeals", tags=["appeals"])
@@ -1,9 +1,16 @@
 from fastapi import APIRouter, HTTPException
 import hashlib
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
 
 from ..schemas import ComplianceCheckRequest, ComplianceCheckResponse
-from ..services.compliance_engine import ComplianceEngine
-from ..utils.cache import compliance_cache
+from ..services.engine_registry import get_engine
+from ..services.llm_cache import get_llm_cache
+from ..services.semantic_cache import get_semantic_cache
+from ..services.verdict_cache import get_verdict_cache
+from ..utils.singleflight import check_flight
 
 # Multi-agent coordinator + alerts
 from ..services.agents.coordinator import CoordinatorAgent
@@ -11,10 +18,52 @@ from ..services.alerts.twilio_alerts import send_alerts_if_needed
 
 router = APIRouter()
 
-# Single-engine for /check
-compliance_engine = ComplianceEngine()
+# Single-engine for /check (shared with the coordinator's agents)
+compliance_engine = get_engine()
 # Coordinator for /check/agents
 coordinator = CoordinatorAgent()
+# Verdicts: per-process tier in front of the shared one, tagged with the regulation version
+verdicts = get_verdict_cache()
+# Near-duplicate texts (None when SEMANTIC_CACHE is off)
+semantic = get_semantic_cache()
+
+DECISION_SEMANTIC = "semantic_cache"
+
+async def _near_duplicate(
+    route: str, request: ComplianceCheckRequest, version: int
+) -> Tuple[Optional[np.ndarray], Optional[ComplianceCheckResponse]]:
+    """
+    (query embedding, cached near-duplicate response). The lexical screen decides its
+    hits without an embedding, so those skip the semantic cache: (None, None).
+    """
+    if semantic is None or compliance_engine.prescreen(request.text) is not None:
+        return None, None
+    t0 = time.time()
+    emb = await compliance_engine.embed(request.text)
+    hit = semantic.lookup(route, request.check_type, emb, version)
+    if hit is None:
+        return emb, None
+    verdict, provenance = hit
+    return emb, ComplianceCheckResponse(**{
+        **verdict,
+        "latency_ms": (time.time() - t0) * 1000.0,
+        "decision_path": DECISION_SEMANTIC,
+        "semantic_match": provenance,
+    })
+
+def _violation_dicts(violations: Optional[List[Any]]) -> List[Dict[str, Any]]:
+    # Response schema wants dicts: lexical verdicts already are, LLM violations are strings
+    return [v if isinstance(v, dict) else {"rule": str(v)} for v in violations or []]
+
+def _remember(route: str, request: ComplianceCheckRequest, emb: Optional[np.ndarray], version: int,
+              cache_key: str, verdict: dict) -> None:
+    if semantic is not None and emb is not None:
+        semantic.add(route, request.check_type, emb, version, verdict, {
+            "cache_key": cache_key,
+            "text": request.text[:200],
+            "decision_path": verdict.get("decision_path"),
+            "cached_at": time.time(),
+        })
 
 @router.post("/check", response_model=ComplianceCheckResponse)
 async def check_compliance(request: ComplianceCheckRequest):
@@ -23,22 +72,34 @@ async def check_compliance(request: ComplianceCheckRequest):
     """
     cache_key = hashlib.md5(f"{request.text}:{request.check_type}".encode()).hexdigest()
 
-    cached = compliance_cache.get(cache_key)
+    version = await verdicts.current_version()
+    cached = await verdicts.get(cache_key, version)
     if cached:
         return cached
 
-    try:
-        result = await compliance_engine.check_compliance(request.text, request.check_type)
+    async def run() -> ComplianceCheckResponse:
+        emb, near = await _near_duplicate("check", request, version)
+        if near is not None:
+            await verdicts.set(cache_key, version, near.model_dump(mode="json"))
+            return near
+        result = await compliance_engine.check_compliance(request.text, request.check_type, embedding=emb)
         response = ComplianceCheckResponse(
             compliant=result["compliant"],
-            score=result.get("score"),
-            violations=result["violations"],
+            score=float(result.get("score") or 0.0),
+            violations=_violation_dicts(result["violations"]),
             suggestions=result.get("suggestions", []),
             model_used=request.check_type,
             latency_ms=result.get("latency_ms", 0),
+            decision_path=result.get("decision_path"),
         )
-        compliance_cache.set(cache_key, response)
+        verdict = response.model_dump(mode="json")
+        await verdicts.set(cache_key, version, verdict)
+        _remember("check", request, emb, version, cache_key, verdict)
         return response
+
+    try:
+        # identical checks already in flight share that one run (and its failure)
+        return await check_flight.do(cache_key, run)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -50,26 +111,41 @@ async def check_compliance_agents(request: ComplianceCheckRequest):
     """
     cache_key = hashlib.md5(f"agents:{request.text}:{request.check_type}".encode()).hexdigest()
 
-    cached = compliance_cache.get(cache_key)
+    version = await verdicts.current_version()
+    cached = await verdicts.get(cache_key, version)
     if cached:
         return cached
 
-    try:
-        synth = await coordinator.run(text=request.text, check_type=request.check_type)
+    async def run() -> ComplianceCheckResponse:
+        emb, near = await _near_duplicate("agents", request, version)
+        if near is not None:
+            await verdicts.set(cache_key, version, near.model_dump(mode="json"))
+            return near
+        synth = await coordinator.run(text=request.text, check_type=request.check_type, embedding=emb)
         response = ComplianceCheckResponse(
             compliant=synth.get("compliant", False),
-            score=None,  # avoid conflicting with single-engine scoring
-            violations=synth.get("violations", []),
+            # only the lexical pre-screen scores a coordinator run; agent runs report 0.0
+            score=float(synth.get("score") or 0.0),
+            violations=_violation_dicts(synth.get("violations")),
             suggestions=synth.get("suggestions", []),
             model_used="coordinator:" + (request.check_type or ""),
             latency_ms=0,
+            decision_path=synth.get("decision_path"),
+            partial=bool(synth.get("partial")),
         )
 
-        # Fire alerts based on severity (critical/high/etc.)
+        # Fire alerts based on severity (critical/high/etc.) -- once per shared run
         await send_alerts_if_needed(original_text=request.text, unified_result=synth)
 
-        compliance_cache.set(cache_key, response)
+        if response.partial:
+            return response  # incomplete verdict: the next request runs the failed agents again
+        verdict = response.model_dump(mode="json")
+        await verdicts.set(cache_key, version, verdict)
+        _remember("agents", request, emb, version, cache_key, verdict)
         return response
+
+    try:
+        return await check_flight.do(cache_key, run)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -95,6 +171,17 @@ async def get_regulations():
         ]
     }
 
+@router.get("/stats")
+async def compliance_stats():
+    """Embedding batcher counters (batch fill, queue depth), verdict / semantic / LLM caches and single-flight counters."""
+    return {
+        "embedding": compliance_engine.embedding_stats(),
+        "verdict_cache": verdicts.stats(),
+        "semantic_cache": semantic.stats() if semantic is not None else None,
+        "llm_cache": llm_cache.stats() if (llm_cache := get_llm_cache()) is not None else None,
+        "single_flight": check_flight.stats(),
+    }
+
 @router.get("/test")
 async def test_compliance():
     """Quick test endpoint"""
@@ -1,19 +1,26 @@
 from __future__ import annotations
 from fastapi import APIRouter, HTTPException, Query
 from uuid import uuid4, UUID
-from typing import Optional, List
+from datetime import datetime
+from typing import Optional, List, Union
+import base64
 import json
+import re
 
-# POOL NOTE: adapt this import to your pool helper
-# e.g., from app.database import pool  OR  from app.database import get_pool
-from app.database import pool  # adjust if named differently
+from app.database import pool
 
-from app.schemas_marketplace import ListingCreate, ListingUpdate, ListingOut, RecheckRequest
-from app.services.queue import enqueue_recheck
+from app.schemas_marketplace import ListingCreate, ListingUpdate, ListingOut, ListingPage, RecheckRequest
+from app.services.queue import enqueue_recheck, LANE_INTERACTIVE, LANE_OFFICER
 
 router = APIRouter(prefix="/products", tags=["products"])
 
-async def _row_to_listing(row) -> ListingOut:
+# Exactly what ListingOut needs (never SELECT *: search_tsv and future columns stay server-side)
+LISTING_COLUMNS = (
+    "id, seller_id, title, description, category, price, inventory, image_url, "
+    "status, last_checked_at, created_at, updated_at"
+)
+
+def _row_to_listing(row) -> ListingOut:
     return ListingOut(
         id=row["id"], seller_id=row["seller_id"], title=row["title"], description=row["description"],
         category=row["category"], price=row["price"], inventory=row["inventory"],
@@ -22,32 +29,58 @@ async def _row_to_listing(row) -> ListingOut:
         created_at=row["created_at"].isoformat(), updated_at=row["updated_at"].isoformat()
     )
 
+_SEARCH_TOKEN = re.compile(r"[^\W_]+")  # Unicode letters / digits ("café", "日本"), never tsquery syntax
+_SEARCH_MAX_TOKENS = 8
+
+def _search_query(q: str) -> Optional[str]:
+    """Prefix tsquery ('lith:* & batt:*') from plain words only: no tsquery syntax reaches Postgres."""
+    tokens = _SEARCH_TOKEN.findall(q.lower())[:_SEARCH_MAX_TOKENS]
+    return " & ".join(f"{t}:*" for t in tokens) or None
+
+def _encode_cursor(row, ranked: bool = False) -> str:
+    key = [row["updated_at"].isoformat(), str(row["id"])]
+    if ranked:
+        key.insert(0, row["rank"])
+    raw = json.dumps(key, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str, ranked: bool = False) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw)
+        rank = float(key.pop(0)) if ranked else None
+        updated_at, listing_id = key
+        out = (datetime.fromisoformat(updated_at), UUID(listing_id))
+        return (rank, *out) if ranked else out
+    except (ValueError, TypeError, AttributeError, IndexError):
+        raise HTTPException(400, "Invalid cursor")
+
 @router.post("", response_model=ListingOut)
 async def create_listing(body: ListingCreate):
     new_id = uuid4()
     async with pool.acquire() as conn:
-        await conn.execute(
-            """
+        row = await conn.fetchrow(
+            f"""
             INSERT INTO listings(id, seller_id, title, description, category, price, inventory, image_url,
                                  status, last_checked_at, created_at, updated_at)
             VALUES($1,$2,$3,$4,$5,$6,$7,$8,'Active', NULL, NOW(), NOW())
+            RETURNING {LISTING_COLUMNS}
             """,
             new_id, body.seller_id, body.title, body.description, body.category, body.price,
             body.inventory, body.image_url
         )
     # fire-and-forget first scan
-    await enqueue_recheck(new_id)
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow("SELECT * FROM listings WHERE id=$1", new_id)
-    return await _row_to_listing(row)
+    await enqueue_recheck(new_id, lane=LANE_INTERACTIVE)
+    return _row_to_listing(row)
 
-@router.get("", response_model=List[ListingOut])
+@router.get("", response_model=Union[ListingPage, List[ListingOut]])
 async def list_listings(
     status: Optional[str] = Query(None),
     seller_id: Optional[str] = Query(None),
     q: Optional[str] = Query(None),
     limit: int = 50,
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = Query(None, description="Keyset mode: '' for the first page, then next_cursor"),
 ):
     where = []
     params = []
@@ -55,23 +88,53 @@ async def list_listings(
         where.append("status = $" + str(len(params)+1)); params.append(status)
     if seller_id:
         where.append("seller_id = $" + str(len(params)+1)); params.append(seller_id)
-    if q:
-        where.append("(title ILIKE $" + str(len(params)+1) + " OR description ILIKE $" + str(len(params)+1) + ")")
-        params.append(f"%{q}%")
-    sql = "SELECT * FROM listings"
+    # Full-text match on the generated search_tsv column (GIN, migration 007), best match first
+    tsq = _search_query(q) if q and q.strip() else None
+    if q and q.strip() and not tsq:
+        # e.g. q="!!!": a search that can match nothing, not a dropped filter
+        return ListingPage(items=[], next_cursor=None) if cursor is not None else []
+    rank_sql = None
+    if tsq:
+        query_sql = f"to_tsquery('english', ${len(params)+1})"
+        params.append(tsq)
+        where.append(f"search_tsv @@ {query_sql}")
+        rank_sql = f"ts_rank(search_tsv, {query_sql})"
+    select = f"SELECT {LISTING_COLUMNS}" + (f", {rank_sql} AS rank" if rank_sql else "") + " FROM listings"
+    order = (f" ORDER BY {rank_sql} DESC, updated_at DESC, id DESC" if rank_sql
+             else " ORDER BY updated_at DESC, id DESC")
+
+    if cursor is not None:
+        # Keyset mode: stable under concurrent updated_at changes, constant cost per page
+        if cursor:
+            if rank_sql:
+                where.append(f"({rank_sql}, updated_at, id) < (${len(params)+1}::real, ${len(params)+2}, ${len(params)+3})")
+            else:
+                where.append(f"(updated_at, id) < (${len(params)+1}, ${len(params)+2})")
+            params.extend(_decode_cursor(cursor, ranked=bool(rank_sql)))
+        sql = select
+        if where: sql += " WHERE " + " AND ".join(where)
+        sql += order + " LIMIT $" + str(len(params)+1)
+        params.append(limit + 1)  # one extra row tells whether there is a next page
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(sql, *params)
+        page = rows[:limit]
+        next_cursor = _encode_cursor(page[-1], ranked=bool(rank_sql)) if len(rows) > limit else None
+        return ListingPage(items=[_row_to_listing(r) for r in page], next_cursor=next_cursor)
+
+    sql = select
     if where: sql += " WHERE " + " AND ".join(where)
-    sql += " ORDER BY updated_at DESC LIMIT $" + str(len(params)+1) + " OFFSET $" + str(len(params)+2)
+    sql += order + " LIMIT $" + str(len(params)+1) + " OFFSET $" + str(len(params)+2)
     params.extend([limit, offset])
     async with pool.acquire() as conn:
         rows = await conn.fetch(sql, *params)
-    return [await _row_to_listing(r) for r in rows]
+    return [_row_to_listing(r) for r in rows]
 
 @router.get("/{listing_id}", response_model=ListingOut)
 async def get_listing(listing_id: UUID):
     async with pool.acquire() as conn:
-        row = await conn.fetchrow("SELECT * FROM listings WHERE id=$1", listing_id)
+        row = await conn.fetchrow(f"SELECT {LISTING_COLUMNS} FROM listings WHERE id=$1", listing_id)
     if not row: raise HTTPException(404, "Listing not found")
-    return await _row_to_listing(row)
+    return _row_to_listing(row)
 
 @router.patch("/{listing_id}", response_model=ListingOut)
 async def update_listing(listing_id: UUID, body: ListingUpdate):
@@ -82,22 +145,22 @@ async def update_listing(listing_id: UUID, body: ListingUpdate):
         params.append(v)
     if not fields:
         async with pool.acquire() as conn:
-            row = await conn.fetchrow("SELECT * FROM listings WHERE id=$1", listing_id)
+            row = await conn.fetchrow(f"SELECT {LISTING_COLUMNS} FROM listings WHERE id=$1", listing_id)
         if not row: raise HTTPException(404, "Listing not found")
-        return await _row_to_listing(row)
+        return _row_to_listing(row)
     params.extend([listing_id])
     async with pool.acquire() as conn:
-        await conn.execute(
+        row = await conn.fetchrow(
             f"UPDATE listings SET {', '.join(fields)}, updated_at=NOW() WHERE id=$" + str(len(params))
+            + f" RETURNING {LISTING_COLUMNS}"
             , *params
         )
-        row = await conn.fetchrow("SELECT * FROM listings WHERE id=$1", listing_id)
     if not row: raise HTTPException(404, "Listing not found")
     # enqueue recheck on edits
-    await enqueue_recheck(listing_id)
-    return await _row_to_listing(row)
+    await enqueue_recheck(listing_id, lane=LANE_INTERACTIVE)
+    return _row_to_listing(row)
 
 @router.post("/{listing_id}/recheck")
 async def recheck_listing(listing_id: UUID):
-    await enqueue_recheck(listing_id)
+    await enqueue_recheck(listing_id, lane=LANE_OFFICER)
     return {"ok": True}
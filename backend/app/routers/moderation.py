@@ -1,9 +1,8 @@
 from __future__ import annotations
 from fastapi import APIRouter
 from uuid import uuid4, UUID
-import json
 
-from app.database import pool  # POOL NOTE
+from app.database import pool
 from app.schemas_marketplace import BanRequest, ReinstateRequest
 
 router = APIRouter(tags=["moderation"])
@@ -27,7 +26,7 @@ async def ban_listing(req: BanRequest):
         await conn.execute("""
             INSERT INTO bans(id, listing_id, reason, evidence_top_rules, created_at)
             VALUES($1,$2,$3,$4::jsonb,NOW())
-        """, uuid4(), req.listing_id, req.reason, json.dumps(req.evidence_top_rules))
+        """, uuid4(), req.listing_id, req.reason, req.evidence_top_rules)
         await conn.execute("UPDATE listings SET status='Banned', updated_at=NOW() WHERE id=$1", req.listing_id)
         await conn.execute("UPDATE flags SET resolved_at=NOW() WHERE listing_id=$1 AND resolved_at IS NULL", req.listing_id)
     return {"ok": True}
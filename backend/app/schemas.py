@@ -34,4 +34,7 @@ class ComplianceCheckResponse(BaseModel):
     violations: List[Dict[str, Any]]
     suggestions: List[str]
     model_used: str
-    latency_ms: float
\ No newline at end of file
+    latency_ms: float
+    decision_path: Optional[str] = None  # llm | no_relevant_rules | ...
+    semantic_match: Optional[Dict[str, Any]] = None  # near-duplicate cache hit: source query + similarity
+    partial: bool = False  # some agents failed; the verdict is not cached
\ No newline at end of file
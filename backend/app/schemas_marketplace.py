@@ -38,6 +38,10 @@ class ListingOut(BaseModel):
     created_at: str
     updated_at: str
 
+class ListingPage(BaseModel):
+    items: List[ListingOut]
+    next_cursor: Optional[str] = None  # None on the last page
+
 class BanRequest(BaseModel):
     listing_id: UUID
     reason: str
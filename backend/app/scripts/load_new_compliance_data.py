@@ -9,11 +9,17 @@ from tqdm import tqdm
 
 load_dotenv()
 
+from app.services.embedding_cache import get_embedding_cache
+
+EMB_MODEL = 'all-MiniLM-L6-v2'
+
 class NeonComplianceLoader:
     """Clear and reload Neon with new compliance data"""
     
     def __init__(self):
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.model = SentenceTransformer(EMB_MODEL)
+        # Same cache as the API and load_all_datasets_to_neon (unchanged rules are not re-encoded)
+        self.embedding_cache = get_embedding_cache(EMB_MODEL)
         self.conn = psycopg2.connect(os.getenv("DATABASE_URL"))
         self.cursor = self.conn.cursor()
         
@@ -119,7 +125,10 @@ class NeonComplianceLoader:
             
             # Generate embeddings for batch
             texts = [r['text'] for r in batch]
-            embeddings = self.model.encode(texts)
+            # Normalized like ComplianceEngine._encode: the cache entries are shared with the API
+            embeddings = self.embedding_cache.encode_many(
+                texts, lambda t: self.model.encode(t, normalize_embeddings=True)
+            )
             
             # Insert batch into database
             for rule, embedding in zip(batch, embeddings):
@@ -141,6 +150,17 @@ class NeonComplianceLoader:
             print(f"  Stored {min(i+batch_size, len(rules))}/{len(rules)} rules...")
         
         print("✅ All rules stored with embeddings")
+        
+        # Listings scanned before this load become due for an early rescan
+        try:
+            self.cursor.execute(
+                "INSERT INTO regulation_loads(source, rows_loaded) VALUES (%s, %s)",
+                ('load_new_compliance_data', len(rules))
+            )
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            print(f"⚠️ Could not record regulation load: {str(e)[:80]}")
     
     def step4_test_similarity(self):
         """Step 4: Test similarity scores"""
@@ -1,12 +1,28 @@
 import asyncio
-from app.services.queue import start_background_workers
+import signal
+from app.database import pool
+from app.services.engine_registry import get_engine
+from app.services.queue import queue_stats, start_background_workers, stop_background_workers
 
 async def main():
-    print("[worker] starting queue worker + periodic scanner")
+    print("[worker] starting queue workers + periodic scanner")
+    await pool.open()
     await start_background_workers()
-    # Keep process alive
-    while True:
-        await asyncio.sleep(3600)
+    # Keep process alive until SIGINT/SIGTERM, then drain in-flight scans
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=60)
+        except asyncio.TimeoutError:
+            print(f"[worker] {queue_stats()}")
+    print("[worker] draining...")
+    await stop_background_workers()
+    await get_engine().close()
+    await pool.close()
+    print(f"[worker] stopped {queue_stats()}")
 
 if __name__ == "__main__":
     asyncio.run(main())
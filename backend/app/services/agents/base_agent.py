@@ -1,19 +1,38 @@
 from dataclasses import dataclass
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+
+import numpy as np
 from ..compliance_engine import ComplianceEngine
+from ..engine_registry import get_engine
 
 @dataclass
 class AgentResult:
     name: str
     table: Optional[str]
     report: Dict[str, Any]
+    status: str = "ok"            # ok | timeout | error
+    error: Optional[str] = None
 
 class BaseComplianceAgent:
     def __init__(self, name: str, table: Optional[str] = None):
         self.name = name
         self.table = table
-        self.engine = ComplianceEngine()
 
-    async def run(self, text: str, check_type: str | None = None) -> AgentResult:
-        res = await self.engine.analyze(text=text, check_type=check_type, table=self.table)
+    @property
+    def engine(self) -> ComplianceEngine:
+        # Shared process-wide engine (embedder, pool, AIRouter); agents only own their table
+        return get_engine()
+
+    async def run(
+        self,
+        text: str,
+        check_type: str | None = None,
+        embedding: Optional[np.ndarray] = None,
+        retrieved: Optional[List[Dict[str, Any]]] = None,
+    ) -> AgentResult:
+        # `embedding` lets a caller (the coordinator) encode the text once for all agents;
+        # `retrieved` carries rows from a batched search over this agent's table (scan_many)
+        res = await self.engine.analyze(
+            text=text, check_type=check_type, table=self.table, embedding=embedding, retrieved=retrieved
+        )
         return AgentResult(name=self.name, table=self.table, report=res)
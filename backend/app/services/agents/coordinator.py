@@ -1,10 +1,17 @@
+import asyncio
+import logging
 from typing import Any, Dict, List, Optional, Tuple
-from .base_agent import AgentResult
+
+import numpy as np
+from .base_agent import AgentResult, BaseComplianceAgent
 from .cpsc_agent import CPSC_Safety_Agent
 from .fda_drug_agent import FDA_Drug_Agent
 from .fda_food_agent import FDA_Food_Agent
 from .fda_device_agent import FDA_Device_Agent
+from .electronics_agent import Electronics_Agent
 from ..ai_router import AIRouter
+from ..compliance_engine import DECISION_LLM, DECISION_NO_CONTEXT
+from ..engine_registry import get_engine
 from ...config import settings
 
 SYSTEM_COORD = (
@@ -16,52 +23,97 @@ SYSTEM_COORD = (
     "IMPORTANT: Do NOT invent or rephrase rules — use ONLY the provided agent rules."
 )
 
+log = logging.getLogger(__name__)
+
 # Optional: only propagate rules from agents if their engine similarity >= this threshold
 RULE_SIM_THRESHOLD = 0.25
 
 class CoordinatorAgent:
     def __init__(self):
+        # Default set for /check/agents; the dispatcher may also route listings to Electronics_Agent
         self.domain_agents = [
             CPSC_Safety_Agent(),
             FDA_Drug_Agent(),
             FDA_Food_Agent(),
             FDA_Device_Agent(),
         ]
-        self.ai = AIRouter()
+        self.agents_by_name = {a.name: a for a in self.domain_agents + [Electronics_Agent()]}
+
+    def select_agents(self, allowed_agents: Optional[List[str]] = None) -> List[BaseComplianceAgent]:
+        if not allowed_agents:
+            return self.domain_agents
+        picked = [self.agents_by_name[n] for n in dict.fromkeys(allowed_agents) if n in self.agents_by_name]
+        return picked or self.domain_agents
+
+    @property
+    def ai(self) -> AIRouter:
+        return get_engine().ai_router
+
+    async def run(
+        self,
+        text: str,
+        check_type: str | None = None,
+        allowed_agents: Optional[List[str]] = None,
+        embedding: Optional[np.ndarray] = None,
+        retrieved: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        `allowed_agents` restricts the run to those agent names (dispatcher routing).
+        `embedding` / `retrieved` (table -> rows) come from a batched caller (scan_many).
+        """
+        # 0) Unambiguous high-signal claim: decide without agents or LLM
+        verdict = get_engine().prescreen(text)
+        if verdict is not None:
+            return {**verdict, "agent_summaries": [], "partial": False}
 
-    async def run(self, text: str, check_type: str | None = None) -> Dict[str, Any]:
         # 1) Run agents
-        results: List[AgentResult] = await self._gather(text, check_type)
+        agents = self.select_agents(allowed_agents)
+        results: List[AgentResult] = await self._gather(text, check_type, agents, embedding, retrieved or {})
 
         # 2) Build a compact, factual summary for the LLM (no free-form “rules” generation)
         agent_payload, merged_rules = self._prepare_payload(results)
 
-        # 3) Ask LLM for the unified verdict ONLY
-        synth = await self.ai.get_structured_response(
-            system=SYSTEM_COORD,
-            user=(
-                "User text:\n"
-                f"{text}\n\n"
-                "Agent findings (JSON):\n"
-                f"{agent_payload}\n\n"
-                "Unify into ONE decision. Return ONLY JSON per schema."
-            ),
-            json_schema={
-                "type": "object",
-                "properties": {
-                    "compliant": {"type": "boolean"},
-                    "violations": {"type": "array", "items": {"type": "string"}},
-                    "severity": {"type": "string"},
-                    "suggestions": {"type": "array", "items": {"type": "string"}},
-                    "confidence": {"type": "number"},
-                    "uses_context": {"type": "boolean"},
-                    "top_rules": {"type": "array", "items": {"type": "string"}},
+        # 3) Ask LLM for the unified verdict ONLY -- unless no agent retrieved anything relevant.
+        #    A timed-out / failed agent might have: never call that compliant without the LLM.
+        ok = [r for r in results if r.status == "ok"]
+        if ok and len(ok) == len(results) and all(r.report.get("decision_path") == DECISION_NO_CONTEXT for r in ok):
+            synth = {
+                "compliant": True,
+                "violations": [],
+                "severity": "low",
+                "suggestions": [],
+                "confidence": min(float(r.report.get("confidence", 0.0)) for r in ok),
+                "uses_context": False,
+                "top_rules": [],
+                "decision_path": DECISION_NO_CONTEXT,
+            }
+        else:
+            synth = await self.ai.get_structured_response(
+                system=SYSTEM_COORD,
+                user=(
+                    "User text:\n"
+                    f"{text}\n\n"
+                    "Agent findings (JSON):\n"
+                    f"{agent_payload}\n\n"
+                    "Unify into ONE decision. Return ONLY JSON per schema."
+                ),
+                json_schema={
+                    "type": "object",
+                    "properties": {
+                        "compliant": {"type": "boolean"},
+                        "violations": {"type": "array", "items": {"type": "string"}},
+                        "severity": {"type": "string"},
+                        "suggestions": {"type": "array", "items": {"type": "string"}},
+                        "confidence": {"type": "number"},
+                        "uses_context": {"type": "boolean"},
+                        "top_rules": {"type": "array", "items": {"type": "string"}},
+                    },
+                    "required": ["compliant","violations","severity","suggestions","confidence","uses_context","top_rules"],
                 },
-                "required": ["compliant","violations","severity","suggestions","confidence","uses_context","top_rules"],
-            },
-            model=settings.OPENAI_MODEL,
-            extras=None,
-        )
+                model=settings.OPENAI_MODEL,
+                extras=None,
+            )
+            synth["decision_path"] = DECISION_LLM
 
         # 4) FORCE grounding: replace LLM-provided top_rules with the merged agent rules
         synth["top_rules"] = merged_rules
@@ -76,15 +128,48 @@ class CoordinatorAgent:
                 "uses_context": r.report.get("uses_context", None),
                 "severity": r.report.get("severity", None),
                 "compliant": r.report.get("compliant", None),
+                "decision_path": r.report.get("decision_path", None),
+                "status": r.status,
+                "error": r.error,
             }
             for r in results
         ]
+        synth["partial"] = any(r.status != "ok" for r in results)
         return synth
 
-    async def _gather(self, text: str, check_type: str | None) -> List[AgentResult]:
-        out: List[AgentResult] = []
-        for agent in self.domain_agents:
-            out.append(await agent.run(text, check_type))
+    async def _gather(
+        self,
+        text: str,
+        check_type: str | None,
+        agents: List[BaseComplianceAgent],
+        embedding: Optional[np.ndarray],
+        retrieved: Dict[str, List[Dict[str, Any]]],
+    ) -> List[AgentResult]:
+        # Same text for every agent: embed once, let each agent reuse the query vector
+        if embedding is None and any(a.table not in retrieved for a in agents):
+            embedding = await get_engine().embed(text)
+        sem = asyncio.Semaphore(max(1, settings.COORDINATOR_MAX_CONCURRENCY))
+        timeout = settings.COORDINATOR_AGENT_TIMEOUT_S
+
+        async def _run_one(agent: BaseComplianceAgent) -> AgentResult:
+            async with sem:
+                try:
+                    return await asyncio.wait_for(
+                        agent.run(text, check_type, embedding=embedding, retrieved=retrieved.get(agent.table)),
+                        timeout=timeout,
+                    )
+                except asyncio.TimeoutError:
+                    log.warning("%s timed out after %.1fs", agent.name, timeout)
+                    return AgentResult(name=agent.name, table=agent.table, report={}, status="timeout",
+                                       error=f"timed out after {timeout:g}s")
+                except Exception as e:
+                    log.warning("%s failed: %s", agent.name, e)
+                    return AgentResult(name=agent.name, table=agent.table, report={}, status="error", error=str(e))
+
+        # Agents are independent (vector search + LLM each): run them concurrently
+        out = list(await asyncio.gather(*(_run_one(a) for a in agents)))
+        if not any(r.status == "ok" for r in out):
+            raise RuntimeError("All domain agents failed: " + "; ".join(f"{r.name}: {r.error}" for r in out))
         return out
 
     def _prepare_payload(self, results: List[AgentResult]) -> Tuple[str, List[str]]:
@@ -101,6 +186,9 @@ class CoordinatorAgent:
         seen = set()
 
         for r in results:
+            if r.status != "ok":
+                compact.append({"name": r.name, "table": r.table, "status": r.status, "error": r.error})
+                continue
             rep = r.report or {}
             top_rules = rep.get("top_rules", []) or []
             score = rep.get("score", 0.0)
@@ -144,3 +232,23 @@ class CoordinatorAgent:
                     break
 
         return _json.dumps(compact, ensure_ascii=False), merged_rules
+
+_coordinator: Optional[CoordinatorAgent] = None
+
+def get_coordinator() -> CoordinatorAgent:
+    """Process-wide coordinator for non-HTTP callers (dispatcher / listings scans)."""
+    global _coordinator
+    if _coordinator is None:
+        _coordinator = CoordinatorAgent()
+    return _coordinator
+
+async def run_coordinator(
+    text: str,
+    allowed_agents: Optional[List[str]] = None,
+    check_type: str | None = None,
+    embedding: Optional[np.ndarray] = None,
+    retrieved: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+) -> Dict[str, Any]:
+    return await get_coordinator().run(
+        text, check_type=check_type, allowed_agents=allowed_agents, embedding=embedding, retrieved=retrieved
+    )
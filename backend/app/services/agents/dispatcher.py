@@ -1,7 +1,9 @@
 from __future__ import annotations
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 import re
 
+import numpy as np
+
 from app.services.image_classifier import extract_tags
 # Your coordinator module should expose a function you can call directly.
 # If not, create a thin wrapper around the same code your /compliance/check/agents route uses.
@@ -38,7 +40,11 @@ async def route_targets_for_listing(text: str, image_url: Optional[str], categor
     # Fallback: if nothing matched, run the general set (all)
     return hits or ["CPSC_Safety_Agent","FDA_Drug_Agent","FDA_Food_Agent","FDA_Device_Agent"]
 
-async def run_coordinator_restricted(text: str, allowed_agents: List[str]) -> dict:
-    # The coordinator should accept a list of agent names/tables to run.
-    # If your current coordinator lacks this param, add it (small diff) or filter after.
-    return await run_coordinator(text=text, allowed_agents=allowed_agents)
+async def run_coordinator_restricted(
+    text: str,
+    allowed_agents: List[str],
+    embedding: Optional[np.ndarray] = None,
+    retrieved: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+) -> dict:
+    # Only the routed agents run; embedding/retrieved are passed through from scan_many
+    return await run_coordinator(text=text, allowed_agents=allowed_agents, embedding=embedding, retrieved=retrieved)
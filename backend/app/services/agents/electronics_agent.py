@@ -0,0 +1,3 @@
+from .base_agent import BaseComplianceAgent
+class Electronics_Agent(BaseComplianceAgent):
+    def __init__(self): super().__init__("Electronics_Agent", "electronics_compliance")
@@ -1,52 +1,209 @@
 from __future__ import annotations
+import asyncio
+import logging
 from uuid import UUID, uuid4
-import json
-from typing import Optional, List
+from typing import Any, Dict, List, Optional, Tuple
 
-from app.database import pool  # POOL NOTE
+from app.database import pool
+from app.services.agents.coordinator import get_coordinator
 from app.services.agents.dispatcher import route_targets_for_listing, run_coordinator_restricted
 from app.services.alerts.twilio_alerts import send_alerts_if_needed  # already in your repo
+from app.services.engine_registry import get_engine
+from app.services.lexical_screen import violation_text
+
+log = logging.getLogger(__name__)
+
+RESULT_INSERT_SQL = """
+INSERT INTO compliance_results(
+    id, listing_id, route, compliant, severity, confidence, uses_context, score,
+    violations, suggestions, top_rules, agent_summaries, created_at
+) VALUES ($1,$2,$3,$4,$5,$6,$7,$8,$9::jsonb,$10::jsonb,$11::jsonb,$12::jsonb,NOW())
+"""
+
+FLAG_INSERT_SQL = """
+INSERT INTO flags(id, listing_id, severity, reason, created_at)
+VALUES($1,$2,$3,$4,NOW())
+"""
+
+# scan_one write path as ONE statement (atomic, one round trip): result row, listing touch,
+# and -- when $13 -- the flag plus status change, chained through data-modifying CTEs.
+# A crash can no longer leave a result without its flag.
+PERSIST_SQL = """
+WITH res AS (
+    INSERT INTO compliance_results(
+        id, listing_id, route, compliant, severity, confidence, uses_context, score,
+        violations, suggestions, top_rules, agent_summaries, created_at
+    ) VALUES ($1,$2,$3,$4,$5,$6,$7,$8,$9::jsonb,$10::jsonb,$11::jsonb,$12::jsonb,NOW())
+    RETURNING id, listing_id
+),
+touched AS (
+    UPDATE listings l
+    SET last_checked_at=NOW(),
+        status = CASE WHEN $13 THEN 'Flagged' ELSE l.status END,
+        updated_at = CASE WHEN $13 THEN NOW() ELSE l.updated_at END
+    FROM res WHERE l.id = res.listing_id
+),
+flag AS (
+    INSERT INTO flags(id, listing_id, severity, reason, created_at)
+    SELECT $14::uuid, res.listing_id, $15::text, $16::text, NOW() FROM res WHERE $13
+    RETURNING id
+)
+SELECT (SELECT id FROM res) AS result_id, (SELECT id FROM flag) AS flag_id
+"""
+
+# What a scan reads from a listing (SELECT * would also ship search_tsv)
+SCAN_COLUMNS = "id, title, description, category, image_url"
+
+def _listing_text(row) -> str:
+    return f"{row['title']}\n{row['description']}".strip()
+
+def _result_params(listing_id: UUID, result: dict) -> tuple:
+    return (
+        uuid4(), listing_id, "listings_agent",
+        result.get("compliant"), result.get("severity"), result.get("confidence"),
+        result.get("uses_context"), max([a.get("score",0) for a in result.get("agent_summaries",[])] + [0]),
+        # jsonb codec on the pool encodes these (app.database._init_connection)
+        result.get("violations",[]),
+        result.get("suggestions",[]),
+        result.get("top_rules",[]),
+        result.get("agent_summaries",[]),
+    )
+
+class PartialScanError(RuntimeError):
+    """Some agents failed: the verdict is incomplete, so it is not persisted and the job retries."""
+
+def _partial_detail(result: dict) -> str:
+    failed = [a.get("name") for a in result.get("agent_summaries", []) if a.get("status") != "ok"]
+    return "partial scan, agents failed: " + ", ".join(str(n) for n in failed)
+
+def _flag_for(result: dict) -> Optional[Tuple[str, str]]:
+    """(severity, reason) when the result must be flagged, else None."""
+    sev = (result.get("severity") or "low").lower()
+    if sev not in ("high","critical"):
+        return None
+    return sev, violation_text((result.get("violations") or ["Policy violation"])[0])
 
 async def scan_one(listing_id: UUID) -> dict:
     async with pool.acquire() as conn:
-        row = await conn.fetchrow("SELECT * FROM listings WHERE id=$1", listing_id)
+        row = await conn.fetchrow(f"SELECT {SCAN_COLUMNS} FROM listings WHERE id=$1", listing_id)
     if not row:
         return {"error": "not_found", "listing_id": str(listing_id)}
 
-    text = f"{row['title']}\n{row['description']}".strip()
+    text = _listing_text(row)
     image_url = row["image_url"]
     targets = await route_targets_for_listing(text=text, image_url=image_url, category=row["category"])
     # call coordinator constrained to those agents
     result = await run_coordinator_restricted(text=text, allowed_agents=targets)
+    if result.get("partial"):
+        # persisting would bump last_checked_at and drop the listing out of rescans
+        raise PartialScanError(_partial_detail(result))
 
-    # persist compliance result
+    # persist compliance result (+ flag): no connection is held during the LLM call above
     async with pool.acquire() as conn:
-        await conn.execute("""
-            INSERT INTO compliance_results(
-                id, listing_id, route, compliant, severity, confidence, uses_context, score,
-                violations, suggestions, top_rules, agent_summaries, created_at
-            ) VALUES ($1,$2,$3,$4,$5,$6,$7,$8,$9::jsonb,$10::jsonb,$11::jsonb,$12::jsonb,NOW())
-        """,
-        uuid4(), listing_id, "listings_agent",
-        result.get("compliant"), result.get("severity"), result.get("confidence"),
-        result.get("uses_context"), max([a.get("score",0) for a in result.get("agent_summaries",[])] + [0]),
-        json.dumps(result.get("violations",[])),
-        json.dumps(result.get("suggestions",[])),
-        json.dumps(result.get("top_rules",[])),
-        json.dumps(result.get("agent_summaries",[])),
-        )
+        flag = await persist_result(conn, listing_id, result)
+    if flag:
+        await send_alerts_if_needed(text, result)
 
-        await conn.execute("UPDATE listings SET last_checked_at=NOW() WHERE id=$1", listing_id)
+    return result
 
-    sev = (result.get("severity") or "low").lower()
-    if sev in ("high","critical"):
-        reason = (result.get("violations") or ["Policy violation"])[0]
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                INSERT INTO flags(id, listing_id, severity, reason, created_at)
-                VALUES($1,$2,$3,$4,NOW())
-            """, uuid4(), listing_id, sev, reason)
-            await conn.execute("UPDATE listings SET status='Flagged', updated_at=NOW() WHERE id=$1", listing_id)
-        await send_alerts_if_needed(sev, listing_id=str(listing_id), summary=reason)
+async def persist_result(conn, listing_id: UUID, result: dict) -> Optional[Tuple[str, str]]:
+    """Writes one scan outcome in a single statement; returns (severity, reason) if flagged."""
+    flag = _flag_for(result)
+    sev, reason = flag or (None, None)
+    # every CTE runs even when unreferenced; all of it commits or none of it does
+    await conn.fetchrow(PERSIST_SQL, *_result_params(listing_id, result), flag is not None, uuid4(), sev, reason)
+    return flag
 
-    return result
+async def _retrieve_batch(
+    texts: List[str], targets: List[List[str]]
+) -> Tuple[Dict[int, Any], List[Dict[str, List[Dict[str, Any]]]]]:
+    """
+    Embeds every text in one pass and runs ONE vector search per table for all the
+    listings routed to it. Returns (index -> embedding, index -> {table: rows}).
+    """
+    engine = get_engine()
+    coordinator = get_coordinator()
+    # Lexical hits are decided by the coordinator before any retrieval: don't embed them
+    need = [i for i, t in enumerate(texts) if engine.prescreen(t) is None]
+    embeddings = dict(zip(need, await engine.embed_many([texts[i] for i in need])))
+
+    by_table: Dict[str, List[int]] = {}
+    for i in need:
+        for agent in coordinator.select_agents(targets[i]):
+            by_table.setdefault(agent.table, []).append(i)
+    blocks = await asyncio.gather(
+        *(engine.retrieve_many(table, [embeddings[i] for i in idxs]) for table, idxs in by_table.items()),
+        return_exceptions=True,
+    )
+    retrieved: List[Dict[str, List[Dict[str, Any]]]] = [{} for _ in texts]
+    for (table, idxs), block in zip(by_table.items(), blocks):
+        if isinstance(block, BaseException):
+            # agents fall back to their own per-listing search
+            log.warning("[scan_many] batched search on %s failed: %s", table, block)
+            continue
+        for i, rows in zip(idxs, block):
+            retrieved[i][table] = rows
+    return embeddings, retrieved
+
+async def scan_many(listing_ids: List[UUID]) -> Dict[UUID, dict]:
+    """
+    Batch variant of scan_one for sweeps: one listings fetch, batched embedding and
+    retrieval, and all results / flags / timestamps written in one transaction.
+    Returns listing_id -> result; failed or partial listings get {"error": "scan_failed", ...}
+    and are not persisted.
+    """
+    ids = list(dict.fromkeys(listing_ids))
+    if not ids:
+        return {}
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(f"SELECT {SCAN_COLUMNS} FROM listings WHERE id = ANY($1::uuid[])", ids)
+    by_id = {r["id"]: r for r in rows}
+    out: Dict[UUID, dict] = {
+        lid: {"error": "not_found", "listing_id": str(lid)} for lid in ids if lid not in by_id
+    }
+    found = [by_id[lid] for lid in ids if lid in by_id]
+    if not found:
+        return out
+
+    texts = [_listing_text(r) for r in found]
+    targets = await asyncio.gather(*(
+        route_targets_for_listing(text=t, image_url=r["image_url"], category=r["category"])
+        for t, r in zip(texts, found)
+    ))
+    embeddings, retrieved = await _retrieve_batch(texts, targets)
+    results = await asyncio.gather(*(
+        run_coordinator_restricted(text=texts[i], allowed_agents=targets[i],
+                                   embedding=embeddings.get(i), retrieved=retrieved[i])
+        for i in range(len(found))
+    ), return_exceptions=True)
+
+    scanned: List[Tuple[Any, str, dict]] = []
+    for row, text, result in zip(found, texts, results):
+        if isinstance(result, BaseException) or result.get("partial"):
+            detail = str(result) if isinstance(result, BaseException) else _partial_detail(result)
+            log.warning("[scan_many] listing %s failed: %s", row["id"], detail)
+            out[row["id"]] = {"error": "scan_failed", "listing_id": str(row["id"]), "detail": detail}
+        else:
+            scanned.append((row, text, result))
+    if not scanned:
+        return out
+
+    flagged = [(row, text, result, flag) for row, text, result in scanned if (flag := _flag_for(result))]
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            await conn.executemany(RESULT_INSERT_SQL, [_result_params(row["id"], result) for row, _, result in scanned])
+            await conn.execute(
+                "UPDATE listings SET last_checked_at=NOW() WHERE id = ANY($1::uuid[])", [row["id"] for row, _, _ in scanned]
+            )
+            if flagged:
+                await conn.executemany(FLAG_INSERT_SQL, [(uuid4(), row["id"], sev, reason) for row, _, _, (sev, reason) in flagged])
+                await conn.execute(
+                    "UPDATE listings SET status='Flagged', updated_at=NOW() WHERE id = ANY($1::uuid[])",
+                    [row["id"] for row, _, _, _ in flagged],
+                )
+
+    for _, text, result, _ in flagged:
+        await send_alerts_if_needed(text, result)
+    for row, _, result in scanned:
+        out[row["id"]] = result
+    return out
@@ -1,3 +1,4 @@
+import asyncio
 import time
 import logging
 import json
@@ -6,10 +7,20 @@ from typing import Dict, Any, Optional, List
 
 from openai import AsyncOpenAI
 from ..config import settings
+from .llm_cache import get_llm_cache, request_key
 
 logger = logging.getLogger(__name__)
 JSON_PATTERN = re.compile(r"\{.*\}", re.S)
 
+# Process-wide cap on in-flight LLM calls (created lazily inside the running loop)
+_llm_slots: Optional[asyncio.Semaphore] = None
+
+def _llm_semaphore() -> asyncio.Semaphore:
+    global _llm_slots
+    if _llm_slots is None:
+        _llm_slots = asyncio.Semaphore(max(1, settings.LLM_MAX_IN_FLIGHT))
+    return _llm_slots
+
 class AIRouter:
     def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None):
         # Lazy; do not raise here
@@ -23,28 +34,51 @@ class AIRouter:
         if self._client is None:
             self._client = AsyncOpenAI(api_key=self.api_key)
 
-    async def _chat(self, messages: List[Dict[str, str]], *, json_mode: bool = False) -> str:
-        self._ensure_client()
-        kwargs = {"model": self.model, "messages": messages, "temperature": 0.2}
+    async def _chat(
+        self, messages: List[Dict[str, str]], *, json_mode: bool = False, model: Optional[str] = None,
+        use_cache: bool = True,
+    ) -> str:
+        # Per-call model override; never mutate self.model (the router is shared process-wide)
+        kwargs = {"model": model or self.model, "messages": messages, "temperature": 0.2}
         if json_mode:
             kwargs["response_format"] = {"type": "json_object"}
-        resp = await self._client.chat.completions.create(**kwargs)
-        return (resp.choices[0].message.content or "").strip()
+        # Same request answered before -> no client, no LLM slot, no network
+        cache = get_llm_cache() if use_cache else None
+        key = request_key(kwargs) if cache is not None else None
+        if cache is not None:
+            hit = await cache.get(key)
+            if hit is not None:
+                return hit
+        self._ensure_client()
+        async with _llm_semaphore():
+            resp = await self._client.chat.completions.create(**kwargs)
+        content = (resp.choices[0].message.content or "").strip()
+        if cache is not None and content and (not json_mode or self._is_json(content)):
+            await cache.set(key, content)
+        return content
+
+    @staticmethod
+    def _is_json(content: str) -> bool:
+        # A truncated / malformed JSON reply parses to {} downstream (compliant=False):
+        # never make that sticky across workers
+        try:
+            json.loads(content)
+            return True
+        except ValueError:
+            return False
 
     # ---------- NEW API ----------
     async def get_text(
-        self, *, system: str, user: str, model: Optional[str] = None, extras: Optional[dict] = None
+        self, *, system: str, user: str, model: Optional[str] = None, extras: Optional[dict] = None,
+        use_cache: bool = True,
     ) -> str:
-        if model:
-            self.model = model
         msgs = [{"role": "system", "content": system}, {"role": "user", "content": user}]
-        return await self._chat(msgs, json_mode=False)
+        return await self._chat(msgs, json_mode=False, model=model, use_cache=use_cache)
 
     async def get_structured_response(
-        self, *, system: str, user: str, json_schema: dict, model: Optional[str] = None, extras: Optional[dict] = None
+        self, *, system: str, user: str, json_schema: dict, model: Optional[str] = None, extras: Optional[dict] = None,
+        use_cache: bool = True,
     ) -> Dict[str, Any]:
-        if model:
-            self.model = model
         schema_hint = json.dumps(
             {"type": "object", "properties": json_schema.get("properties", {}), "required": json_schema.get("required", [])},
             indent=0,
@@ -55,7 +89,7 @@ class AIRouter:
             f"{schema_hint}"
         )
         msgs = [{"role": "system", "content": sys_msg}, {"role": "user", "content": user}]
-        raw = await self._chat(msgs, json_mode=True)
+        raw = await self._chat(msgs, json_mode=True, model=model, use_cache=use_cache)
         try:
             return json.loads(raw)
         except Exception:
@@ -63,11 +97,13 @@ class AIRouter:
             return json.loads(m.group(0)) if m else {}
 
     # ---------- LEGACY API (compat) ----------
-    async def legacy_get_text(self, prompt: str) -> str:
+    async def legacy_get_text(self, prompt: str, use_cache: bool = True) -> str:
         msgs = [{"role": "user", "content": prompt}]
-        return await self._chat(msgs, json_mode=False)
+        return await self._chat(msgs, json_mode=False, use_cache=use_cache)
 
-    async def legacy_get_structured_response(self, prompt: str, model_type: Optional[str] = None) -> Dict[str, Any]:
+    async def legacy_get_structured_response(
+        self, prompt: str, model_type: Optional[str] = None, use_cache: bool = True
+    ) -> Dict[str, Any]:
         # You can map model_type to a different model if needed; otherwise ignore.
         schema_req = (
             "Respond ONLY with valid JSON using exactly these keys: "
@@ -76,7 +112,7 @@ class AIRouter:
             '"confidence": <number 0..1> }'
         )
         msgs = [{"role": "system", "content": schema_req}, {"role": "user", "content": prompt}]
-        raw = await self._chat(msgs, json_mode=True)
+        raw = await self._chat(msgs, json_mode=True, use_cache=use_cache)
         try:
             return json.loads(raw)
         except Exception:
@@ -91,8 +127,11 @@ def _get_router() -> AIRouter:
         _router_singleton = AIRouter()
     return _router_singleton
 
-async def get_structured_response(*, system: str, user: str, json_schema: dict, model: str, extras: dict | None = None):
-    return await _get_router().get_structured_response(system=system, user=user, json_schema=json_schema, model=model, extras=extras)
+async def get_structured_response(*, system: str, user: str, json_schema: dict, model: str, extras: dict | None = None,
+                                  use_cache: bool = True):
+    return await _get_router().get_structured_response(
+        system=system, user=user, json_schema=json_schema, model=model, extras=extras, use_cache=use_cache
+    )
 
-async def get_text(*, system: str, user: str, model: str, extras: dict | None = None):
-    return await _get_router().get_text(system=system, user=user, model=model, extras=extras)
+async def get_text(*, system: str, user: str, model: str, extras: dict | None = None, use_cache: bool = True):
+    return await _get_router().get_text(system=system, user=user, model=model, extras=extras, use_cache=use_cache)
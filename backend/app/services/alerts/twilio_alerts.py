@@ -2,6 +2,7 @@ from typing import Dict, Any, Optional
 import logging
 from twilio.rest import Client
 from ...config import settings
+from ..lexical_screen import violation_text
 
 log = logging.getLogger(__name__)
 _client: Optional[Client] = None
@@ -44,7 +45,7 @@ def _format_summary(unified_result: Dict[str, Any]) -> str:
     sev = (unified_result.get("severity") or "unknown").upper()
     comp = "COMPLIANT" if unified_result.get("compliant", False) else "NON-COMPLIANT"
     vios = unified_result.get("violations", []) or []
-    head = vios[0] if vios else "No explicit violations listed"
+    head = violation_text(vios[0]) if vios else "No explicit violations listed"
     conf = unified_result.get("confidence", None)
     conf_txt = f" (confidence {conf:.2f})" if isinstance(conf, (float, int)) else ""
     return f"[ComplianceMonster] Severity: {sev} — {comp}{conf_txt}. Top: {head}"
@@ -53,7 +54,7 @@ def _voice_twiml(unified_result: Dict[str, Any]) -> str:
     sev = unified_result.get("severity", "unknown")
     comp = "compliant" if unified_result.get("compliant", False) else "non-compliant"
     vios = unified_result.get("violations", []) or []
-    brief = vios[0] if vios else "no violations listed"
+    brief = violation_text(vios[0]) if vios else "no violations listed"
     return f"""<?xml version="1.0" encoding="UTF-8"?>
 <Response>
   <Say voice="Polly.Joanna">Compliance Alert. Severity {sev}. Determined {comp}. Key issue: {brief}.</Say>
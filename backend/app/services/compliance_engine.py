@@ -1,8 +1,10 @@
 import asyncio
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import asyncpg
+import numpy as np
 
 try:
     from sentence_transformers import SentenceTransformer
@@ -10,13 +12,20 @@ except Exception:
     SentenceTransformer = None  # type: ignore
 
 from ..config import settings
+from ..database import pool as db_pool
 from .ai_router import AIRouter
+from .embedding_cache import get_embedding_cache
+from .lexical_screen import get_screen
 
 VECTOR_DIM = 384
 DEFAULT_TOP_K = 5
 SIM_THRESHOLD = 0.25
 EMB_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 
+# decision_path values reported with every analyze() result
+DECISION_LLM = "llm"
+DECISION_NO_CONTEXT = "no_relevant_rules"  # retrieval below threshold, LLM skipped
+
 TABLES = [
     "cpsc_recalls",
     "fda_drug_enforcement",
@@ -33,18 +42,155 @@ ORDER BY embedding <=> $1::vector
 LIMIT $2
 """
 
+# All TABLES in one statement: per-table top-k via LATERAL (keeps each ANN index scan),
+# then the global top-k is cut by the database.
+UNION_BRANCH = """
+  SELECT h.rule_text, h.similarity, h.severity, '{table}' AS source_table
+  FROM q CROSS JOIN LATERAL (
+    SELECT rule_text, 1 - (embedding <=> q.v) AS similarity, severity
+    FROM {table}
+    ORDER BY embedding <=> q.v
+    LIMIT $2
+  ) h"""
+
+UNION_SELECT = """
+WITH q AS (SELECT $1::vector AS v)
+SELECT rule_text, similarity, severity, source_table
+FROM ({branches}
+) hits
+ORDER BY similarity DESC
+LIMIT $2
+""".format(branches="\n  UNION ALL".join(UNION_BRANCH.format(table=t) for t in TABLES))
+
+# One table, many query vectors (scan_many): per-query top-k via LATERAL over a VALUES list
+BATCH_SELECT = """
+SELECT q.idx, h.rule_text, h.similarity, h.severity
+FROM (VALUES {values}) AS q(v, idx)
+CROSS JOIN LATERAL (
+  SELECT rule_text, 1 - (embedding <=> q.v) AS similarity, severity
+  FROM {table}
+  ORDER BY embedding <=> q.v
+  LIMIT $1
+) h
+ORDER BY q.idx, h.similarity DESC
+"""
+
+class EmbeddingBatcher:
+    """
+    Collects concurrent embed() calls for up to `max_wait_ms` (or until `max_batch_size`
+    texts are waiting), encodes them as ONE batch in a worker thread and resolves each
+    caller's future. Keeps SentenceTransformer.encode off the event loop.
+    """
+
+    def __init__(self, encode_batch: Callable[[List[str]], Any], max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self._encode_batch = encode_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_ms = max(0.0, float(max_wait_ms))
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._executor: Optional[ThreadPoolExecutor] = None  # created on first batch, again after close()
+        self._in_flight = 0
+        # counters
+        self.batches = 0
+        self.texts = 0
+        self.largest_batch = 0
+        self.max_queue_depth = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending) + self._in_flight
+
+    async def embed(self, text: str) -> Any:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((text, fut))
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000.0, self._flush)
+        return await fut
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            batch = self._pending[: self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+            loop.create_task(self._run(batch))
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        texts = [t for t, _ in batch]
+        self._in_flight += len(batch)
+        self.batches += 1
+        self.texts += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        if self._executor is None:
+            # One thread: the model is not shared between concurrent encode() calls
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedder")
+        try:
+            vecs = await asyncio.get_running_loop().run_in_executor(self._executor, self._encode_batch, texts)
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+        else:
+            for (_, fut), vec in zip(batch, vecs):
+                if not fut.done():  # caller may have been cancelled meanwhile
+                    fut.set_result(vec)
+        finally:
+            self._in_flight -= len(batch)
+
+    def close(self) -> None:
+        # Reusable afterwards (next lifespan, possibly on a new event loop)
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        for _, fut in pending:
+            if not fut.done():
+                fut.set_exception(RuntimeError("embedding batcher closed"))
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        avg = (self.texts / self.batches) if self.batches else 0.0
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch_size": avg,
+            "avg_batch_fill": avg / self.max_batch_size,
+            "largest_batch": self.largest_batch,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+        }
+
 class ComplianceEngine:
     def __init__(self):
-        self._pool: Optional[asyncpg.Pool] = None
         self._embedder = None
+        self._table_slots: Dict[str, asyncio.Semaphore] = {}
+        self._cache = get_embedding_cache(EMB_MODEL)
+        self._batcher = EmbeddingBatcher(
+            self._encode_batch,
+            max_batch_size=settings.EMBED_BATCH_SIZE,
+            max_wait_ms=settings.EMBED_MAX_WAIT_MS,
+        )
         self.ai_router = AIRouter()
 
-    async def _get_pool(self) -> asyncpg.Pool:
-        if self._pool is None:
-            if not settings.DATABASE_URL:
-                raise RuntimeError("DATABASE_URL is not set.")
-            self._pool = await asyncpg.create_pool(dsn=settings.DATABASE_URL)
-        return self._pool
+    async def get_pool(self) -> asyncpg.Pool:
+        # The app-wide pool (app.database); its connections carry the pgvector codec
+        return await db_pool.open()
+
+    async def close(self) -> None:
+        # The pool belongs to the app lifespan, not to the engine. The registry hands this
+        # engine to the next lifespan, so drop loop-bound state rather than disabling it.
+        self._batcher.close()
+        self._table_slots.clear()
 
     def _get_embedder(self):
         if self._embedder is None:
@@ -53,29 +199,88 @@ class ComplianceEngine:
             self._embedder = SentenceTransformer(EMB_MODEL)
         return self._embedder
 
-    def _embed(self, text: str) -> List[float]:
+    def _encode(self, texts: List[str]):
         model = self._get_embedder()
-        v = model.encode(text, normalize_embeddings=True)
-        return [float(x) for x in v]
+        return model.encode(texts, normalize_embeddings=True, batch_size=len(texts))
 
-    @staticmethod
-    def _vector_literal(vec: List[float]) -> str:
-        return "[" + ",".join(f"{x:.6f}" for x in vec) + "]"
+    def _encode_batch(self, texts: List[str]):
+        # Runs in the batcher's worker thread (disk cache + model load included)
+        return self._cache.encode_many(texts, self._encode)
+
+    async def _embed(self, text: str) -> np.ndarray:
+        hit = self._cache.get_cached(text)
+        if hit is not None:
+            return hit
+        v = await self._batcher.embed(text)
+        return np.asarray(v, dtype=np.float32)
+
+    async def embed(self, text: str) -> np.ndarray:
+        """Query vector for `text`; pass it back as analyze(embedding=...) to reuse it."""
+        return await self._embed(text)
+
+    async def embed_many(self, texts: List[str]) -> List[np.ndarray]:
+        """Query vectors for several texts; concurrent calls share the batcher's encode batches."""
+        return list(await asyncio.gather(*(self._embed(t) for t in texts)))
 
-    async def _search_table(self, pool: asyncpg.Pool, table: str, emb: List[float], top_k: int) -> List[Dict[str, Any]]:
-        vec = self._vector_literal(emb)
+    def embedding_stats(self) -> Dict[str, Any]:
+        return {**self._batcher.stats(), "cache": self._cache.stats()}
+
+    def _table_slot(self, table: str) -> asyncio.Semaphore:
+        # Per-table cap on concurrent vector searches so one hot table can't drain the pool
+        slot = self._table_slots.get(table)
+        if slot is None:
+            slot = self._table_slots[table] = asyncio.Semaphore(max(1, settings.DB_TABLE_CONCURRENCY))
+        return slot
+
+    async def _search_table(self, pool: asyncpg.Pool, table: str, emb: np.ndarray, top_k: int) -> List[Dict[str, Any]]:
         sql = SELECT_CLAUSE.format(table=table)
-        async with pool.acquire() as conn:
-            rows = await conn.fetch(sql, vec, top_k)
+        async with self._table_slot(table), pool.acquire() as conn:
+            rows = await conn.fetch(sql, emb, top_k)
         return [{"rule_text": r["rule_text"], "similarity": float(r["similarity"]), "severity": r["severity"]} for r in rows]
 
-    async def _retrieve(self, text: str, table: Optional[str], top_k: int) -> Tuple[List[Dict[str, Any]], float]:
-        pool = await self._get_pool()
-        emb = self._embed(text)
+    async def _search_all_tables(self, pool: asyncpg.Pool, emb: np.ndarray, top_k: int) -> List[Dict[str, Any]]:
+        async with self._table_slot("*"), pool.acquire() as conn:
+            rows = await conn.fetch(UNION_SELECT, emb, top_k)
+        return [
+            {"rule_text": r["rule_text"], "similarity": float(r["similarity"]), "severity": r["severity"], "table": r["source_table"]}
+            for r in rows
+        ]
+
+    async def retrieve_many(
+        self, table: str, embeddings: List[np.ndarray], top_k: int = DEFAULT_TOP_K
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Top-k rows from `table` for each query vector, one statement per chunk of
+        EMBED_BATCH_SIZE vectors. Pass each list back as analyze(retrieved=...).
+        """
+        pool = await self.get_pool()
+        out: List[List[Dict[str, Any]]] = [[] for _ in embeddings]
+        chunk = max(1, settings.EMBED_BATCH_SIZE)
+        for start in range(0, len(embeddings), chunk):
+            part = embeddings[start:start + chunk]
+            values = ", ".join(f"(${i + 2}::vector, {i})" for i in range(len(part)))
+            sql = BATCH_SELECT.format(values=values, table=table)
+            async with self._table_slot(table), pool.acquire() as conn:
+                rows = await conn.fetch(sql, top_k, *part)
+            for r in rows:
+                out[start + r["idx"]].append(
+                    {"rule_text": r["rule_text"], "similarity": float(r["similarity"]), "severity": r["severity"]}
+                )
+        return out
+
+    async def _retrieve(
+        self, text: str, table: Optional[str], top_k: int, embedding: Optional[np.ndarray] = None
+    ) -> Tuple[List[Dict[str, Any]], float]:
+        pool = await self.get_pool()
+        emb = embedding if embedding is not None else await self._embed(text)
         if table:
             rows = await self._search_table(pool, table, emb, top_k)
             return rows, max((r["similarity"] for r in rows), default=0.0)
 
+        if settings.RETRIEVE_MODE == "union":
+            rows = await self._search_all_tables(pool, emb, top_k)
+            return rows, max((r["similarity"] for r in rows), default=0.0)
+
         tasks = [self._search_table(pool, t, emb, top_k) for t in TABLES]
         blocks = await asyncio.gather(*tasks)
         merged: List[Dict[str, Any]] = []
@@ -92,9 +297,49 @@ class ComplianceEngine:
         lines = [f"- {r['rule_text']} (sim={r['similarity']:.3f}, sev={r.get('severity')})" for r in rows]
         return "RULES:\n" + "\n".join(lines) + "\n"
 
-    async def analyze(self, text: str, check_type: Optional[str] = None, table: Optional[str] = None, top_k: int = DEFAULT_TOP_K) -> Dict[str, Any]:
+    def prescreen(self, text: str) -> Optional[Dict[str, Any]]:
+        """Immediate verdict for unambiguous high-signal claims (no embedding / retrieval / LLM)."""
+        if not settings.LEXICAL_PRESCREEN:
+            return None
+        return get_screen().verdict(text)
+
+    async def analyze(
+        self,
+        text: str,
+        check_type: Optional[str] = None,
+        table: Optional[str] = None,
+        top_k: int = DEFAULT_TOP_K,
+        embedding: Optional[np.ndarray] = None,
+        retrieved: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
         t0 = time.time()
-        rows, max_sim = await self._retrieve(text, table, top_k)
+        verdict = self.prescreen(text)
+        if verdict is not None:
+            verdict["latency_ms"] = (time.time() - t0) * 1000.0
+            return verdict
+
+        if retrieved is not None:
+            rows = retrieved[:top_k]
+            max_sim = max((r["similarity"] for r in rows), default=0.0)
+        else:
+            rows, max_sim = await self._retrieve(text, table, top_k, embedding=embedding)
+        top_rules = [r["rule_text"] for r in rows][:top_k]
+
+        # Fast path: nothing relevant retrieved -> deterministic low-risk verdict, no LLM call
+        if settings.LLM_FAST_PATH and max_sim < settings.LLM_FAST_PATH_THRESHOLD:
+            return {
+                "compliant": True,
+                "violations": [],
+                "severity": "low",
+                "suggestions": [],
+                "confidence": round(1.0 - float(max_sim), 3),
+                "uses_context": False,
+                "top_rules": top_rules,
+                "score": float(max_sim),
+                "latency_ms": (time.time() - t0) * 1000.0,
+                "decision_path": DECISION_NO_CONTEXT,
+            }
+
         rules = self._rules_block(rows)
 
         # LEGACY prompt path for compatibility with previous pipelines
@@ -112,7 +357,6 @@ class ComplianceEngine:
         confidence  = float(parsed.get("confidence", 0.0))
 
         uses_context = bool(max_sim >= SIM_THRESHOLD)
-        top_rules = [r["rule_text"] for r in rows][:top_k]
         score = float(max_sim)
         latency_ms = (time.time() - t0) * 1000.0
 
@@ -126,9 +370,12 @@ class ComplianceEngine:
             "top_rules": top_rules,
             "score": score,
             "latency_ms": latency_ms,
+            "decision_path": DECISION_LLM,
         }
 
-    async def check_compliance(self, text: str, check_type: Optional[str] = None) -> Dict[str, Any]:
+    async def check_compliance(
+        self, text: str, check_type: Optional[str] = None, embedding: Optional[np.ndarray] = None
+    ) -> Dict[str, Any]:
         table_map = {
             "safety": "cpsc_recalls",
             "drug": "fda_drug_enforcement",
@@ -136,4 +383,4 @@ class ComplianceEngine:
             "device": "fda_device_data",
         }
         table = table_map.get((check_type or "").lower(), None)
-        return await self.analyze(text=text, check_type=check_type, table=table, top_k=DEFAULT_TOP_K)
+        return await self.analyze(text=text, check_type=check_type, table=table, top_k=DEFAULT_TOP_K, embedding=embedding)
@@ -0,0 +1,186 @@
+"""
+Embedding cache shared by ComplianceEngine and the ingestion loaders.
+
+Two tiers, keyed by model name + SHA-256 of the normalized text:
+  - in-memory LRU bounded by bytes (float32 vectors)
+  - on-disk SQLite store of float16 vectors (survives restarts / re-ingestion)
+"""
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..config import settings
+
+log = logging.getLogger(__name__)
+
+_WS = re.compile(r"\s+")
+_ENTRY_OVERHEAD = 120  # approx. bytes per LRU entry on top of the vector itself
+_SQL_CHUNK = 500       # stay well under SQLite's bound-parameter limit
+_BUSY_TIMEOUT_MS = 200 # another worker holding the write lock: give up (miss / skip) instead of waiting 5s
+
+def normalize_text(text: str) -> str:
+    # MiniLM's tokenizer is uncased and whitespace-insensitive, so these all embed the same
+    return _WS.sub(" ", unicodedata.normalize("NFKC", text or "")).strip().lower()
+
+def canonical_model_name(model_name: str) -> str:
+    # "sentence-transformers/all-MiniLM-L6-v2" and "all-MiniLM-L6-v2" are the same model
+    return model_name.split("/", 1)[1] if model_name.startswith("sentence-transformers/") else model_name
+
+class EmbeddingCache:
+    def __init__(self, model_name: str, path: Optional[str] = None, max_memory_bytes: int = 64 * 1024 * 1024):
+        self.model_name = canonical_model_name(model_name)
+        self.max_memory_bytes = max_memory_bytes
+        self._mem: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._mem_bytes = 0
+        self._lock = threading.Lock()     # memory LRU only; get_cached takes it on the event loop
+        self._db_lock = threading.Lock()  # the SQLite connection; never held together with _lock
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            try:
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute(f"PRAGMA busy_timeout={_BUSY_TIMEOUT_MS}")
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vec BLOB NOT NULL)")
+                self._db.commit()
+            except sqlite3.Error as e:
+                log.warning("Embedding disk cache disabled (%s): %s", path, e)
+                self._db = None
+        # counters
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def key(self, text: str) -> str:
+        digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+        return f"{self.model_name}:{digest}"
+
+    # ---------- memory tier ----------
+    def _mem_get(self, key: str) -> Optional[np.ndarray]:
+        vec = self._mem.get(key)
+        if vec is not None:
+            self._mem.move_to_end(key)
+        return vec
+
+    def _mem_put(self, key: str, vec: np.ndarray) -> None:
+        vec.setflags(write=False)  # handed out to callers as-is
+        old = self._mem.pop(key, None)
+        if old is not None:
+            self._mem_bytes -= old.nbytes + _ENTRY_OVERHEAD
+        self._mem[key] = vec
+        self._mem_bytes += vec.nbytes + _ENTRY_OVERHEAD
+        while self._mem_bytes > self.max_memory_bytes and self._mem:
+            _, evicted = self._mem.popitem(last=False)
+            self._mem_bytes -= evicted.nbytes + _ENTRY_OVERHEAD
+
+    def get_cached(self, text: str) -> Optional[np.ndarray]:
+        """Memory tier only; cheap enough to call on the event loop."""
+        with self._lock:
+            vec = self._mem_get(self.key(text))
+            if vec is not None:
+                self.memory_hits += 1
+            return vec
+
+    # ---------- disk tier (errors are misses / skipped writes) ----------
+    def _disk_get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        if self._db is None or not keys:
+            return found
+        try:
+            with self._db_lock:
+                for i in range(0, len(keys), _SQL_CHUNK):
+                    chunk = keys[i:i + _SQL_CHUNK]
+                    marks = ",".join("?" * len(chunk))
+                    for key, blob in self._db.execute(f"SELECT key, vec FROM embeddings WHERE key IN ({marks})", chunk):
+                        found[key] = np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+        except sqlite3.Error as e:
+            log.warning("Embedding disk cache read failed: %s", e)
+        return found
+
+    def _disk_put_many(self, items: Dict[str, np.ndarray]) -> None:
+        if self._db is None or not items:
+            return
+        try:
+            with self._db_lock, self._db:  # commits, or rolls back on error
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings(key, vec) VALUES (?, ?)",
+                    [(k, v.astype(np.float16).tobytes()) for k, v in items.items()],
+                )
+        except sqlite3.Error as e:
+            log.warning("Embedding disk cache write failed: %s", e)
+
+    # ---------- public ----------
+    def encode_many(self, texts: Sequence[str], encode_fn: Callable[[List[str]], Sequence]) -> np.ndarray:
+        """
+        Vectors for `texts` (float32, one row per text). Only texts missing from both
+        tiers are passed to `encode_fn`, once per distinct key. Blocking: call from a
+        worker thread or a sync loader.
+        """
+        keys = [self.key(t) for t in texts]
+        out: List[Optional[np.ndarray]] = [None] * len(texts)
+        with self._lock:
+            for i, k in enumerate(keys):
+                vec = self._mem_get(k)
+                if vec is not None:
+                    self.memory_hits += 1
+                    out[i] = vec
+            pending = list(dict.fromkeys(k for k, v in zip(keys, out) if v is None))
+        # disk I/O outside the memory lock: a busy SQLite file must not stall get_cached()
+        from_disk = self._disk_get_many(pending)
+        with self._lock:
+            for k, vec in from_disk.items():
+                self._mem_put(k, vec)
+
+            missing: Dict[str, str] = {}
+            for i, k in enumerate(keys):
+                if out[i] is not None:
+                    continue
+                if k in from_disk:
+                    self.disk_hits += 1
+                    out[i] = from_disk[k]
+                else:
+                    missing.setdefault(k, texts[i])
+            self.misses += len(missing)
+
+        if missing:
+            encoded = np.asarray(encode_fn(list(missing.values())), dtype=np.float32)
+            fresh = dict(zip(missing.keys(), encoded))
+            with self._lock:
+                for k, vec in fresh.items():
+                    self._mem_put(k, vec)
+            self._disk_put_many(fresh)
+            for i, k in enumerate(keys):
+                if out[i] is None:
+                    out[i] = fresh[k]
+
+        return np.stack(out) if out else np.empty((0, 0), dtype=np.float32)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "memory_entries": len(self._mem),
+            "memory_bytes": self._mem_bytes,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+        }
+
+_caches: Dict[str, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+def get_embedding_cache(model_name: str) -> EmbeddingCache:
+    """One cache per model per process; the disk file is shared by every process."""
+    name = canonical_model_name(model_name)
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = EmbeddingCache(
+                name, path=settings.EMBED_CACHE_PATH or None, max_memory_bytes=settings.EMBED_CACHE_MAX_BYTES
+            )
+        return _caches[name]
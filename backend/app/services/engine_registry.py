@@ -0,0 +1,40 @@
+"""
+Process-wide ComplianceEngine registry.
+
+Every agent, router and script shares ONE engine per worker process, i.e. one
+SentenceTransformer and one AIRouter, on top of the app-wide asyncpg pool
+(app.database.pool). The FastAPI lifespan owns it via startup()/shutdown().
+"""
+import logging
+from typing import Optional
+
+from .compliance_engine import ComplianceEngine
+
+log = logging.getLogger(__name__)
+
+class EngineRegistry:
+    def __init__(self):
+        self._engine: Optional[ComplianceEngine] = None
+
+    def get_engine(self) -> ComplianceEngine:
+        if self._engine is None:
+            self._engine = ComplianceEngine()
+        return self._engine
+
+    async def startup(self) -> None:
+        engine = self.get_engine()
+        try:
+            await engine.get_pool()
+        except Exception as e:
+            # Keep the API up (e.g. sqlite dev DATABASE_URL); the pool is retried lazily
+            log.warning("Compliance pool not created at startup: %s", e)
+
+    async def shutdown(self) -> None:
+        if self._engine is not None:
+            # Stays registered (and its model loaded) for a later startup(); close() leaves it reusable
+            await self._engine.close()
+
+registry = EngineRegistry()
+
+def get_engine() -> ComplianceEngine:
+    return registry.get_engine()
@@ -0,0 +1,165 @@
+"""
+Deterministic lexical pre-screen for high-signal violation claims.
+
+An Aho-Corasick automaton is compiled once from RULE_LEXICON. Unambiguous hits
+("FDA approved", "cures diabetes", ...) yield an immediate verdict without
+embedding, vector search or an LLM call; everything else goes through analyze().
+"""
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+DECISION_LEXICAL = "lexical_prescreen"
+
+@dataclass(frozen=True)
+class LexiconRule:
+    rule_text: str
+    severity: str                 # critical | high
+    phrases: Tuple[str, ...]
+    definitive: bool = True       # False: report the hit but still let the LLM decide
+
+# Mirrors the high_match_rules seeded by scripts/load_new_compliance_data.py
+RULE_LEXICON: List[LexiconRule] = [
+    LexiconRule(
+        "Products cannot claim FDA approved without actual FDA approval", "high",
+        ("fda approved", "fda-approved", "approved by the fda", "fda certified", "fda-certified"),
+    ),
+    LexiconRule(
+        "Supplements cannot claim to cure diseases", "critical",
+        ("cures diabetes", "cures cancer", "cure for cancer", "cure for diabetes", "cures arthritis",
+         "cures covid", "cures alzheimer's", "cures hiv", "prevents cancer", "reverses diabetes"),
+    ),
+    # Bare "cures" is common in non-health copy (epoxy, concrete): surface it, don't decide on it
+    LexiconRule("Supplements cannot claim to cure diseases", "high", ("cures", "cure all", "miracle cure"), definitive=False),
+    LexiconRule(
+        "Products cannot guarantee results without evidence", "high",
+        ("guaranteed weight loss", "guaranteed to lose", "guaranteed fat loss", "lose weight guaranteed",
+         "guaranteed results"),
+    ),
+    # "CHOKING HAZARD -- Small parts" is the label CPSC *requires*: report it, let the LLM decide
+    LexiconRule("Toys must not have choking hazards for children under 3", "high", ("choking hazard",), definitive=False),
+    LexiconRule("Products must not contain lead paint over 90 ppm", "high", ("lead paint",), definitive=False),
+]
+
+# A hit with one of these within a few words before or after it is a negation or a
+# warning label ("WARNING: ...", "aren't FDA approved", "FDA approved? Not this one"),
+# i.e. ambiguous. Any "...n't" contraction counts as a negation.
+_CUE_WINDOW = 3
+_CUES = {"not", "no", "never", "without", "non", "nor", "warning", "caution"}
+_WORD = re.compile(r"[a-z0-9']+")
+_WS = re.compile(r"\s+")
+_SEV_RANK = {"critical": 2, "high": 1}
+
+class AhoCorasick:
+    """Multi-pattern matcher: one pass over the text regardless of lexicon size."""
+
+    def __init__(self, patterns: Iterable[Tuple[str, Any]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, Any]]] = [[]]  # (pattern length, payload)
+        for pattern, payload in patterns:
+            node = 0
+            for ch in pattern:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append((len(pattern), payload))
+        self._build_failure_links()
+
+    def _build_failure_links(self) -> None:
+        queue = list(self._goto[0].values())
+        for node in queue:  # BFS; queue grows while iterating
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[child] = self._goto[f].get(ch, 0)
+                self._out[child].extend(self._out[self._fail[child]])
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """Yields (start, end, payload) for every occurrence, overlapping included."""
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for length, payload in self._out[node]:
+                yield i - length + 1, i + 1, payload
+
+@dataclass
+class ScreenHit:
+    phrase: str
+    rule_text: str
+    severity: str
+    definitive: bool
+
+class LexicalScreen:
+    def __init__(self, lexicon: Iterable[LexiconRule] = RULE_LEXICON):
+        self._matcher = AhoCorasick(
+            (self._normalize(p), (self._normalize(p), rule)) for rule in lexicon for p in rule.phrases
+        )
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return _WS.sub(" ", (text or "").lower().replace("\u2019", "'"))
+
+    @staticmethod
+    def _is_cue(word: str) -> bool:
+        return word in _CUES or word.endswith("n't")
+
+    def scan(self, text: str) -> List[ScreenHit]:
+        norm = self._normalize(text)
+        hits: List[ScreenHit] = []
+        for start, end, (phrase, rule) in self._matcher.finditer(norm):
+            # whole words only ("cures" must not fire inside "secures")
+            if (start > 0 and norm[start - 1].isalnum()) or (end < len(norm) and norm[end].isalnum()):
+                continue
+            nearby = _WORD.findall(norm[max(0, start - 64):start])[-_CUE_WINDOW:] + _WORD.findall(norm[end:end + 64])[:_CUE_WINDOW]
+            definitive = rule.definitive and not any(self._is_cue(w) for w in nearby)
+            hits.append(ScreenHit(phrase=phrase, rule_text=rule.rule_text, severity=rule.severity, definitive=definitive))
+        return hits
+
+    def verdict(self, text: str) -> Optional[Dict[str, Any]]:
+        """Immediate non-compliant verdict for unambiguous hits, else None (ask the LLM)."""
+        definitive = [h for h in self.scan(text) if h.definitive]
+        if not definitive:
+            return None
+        definitive.sort(key=lambda h: _SEV_RANK.get(h.severity, 0), reverse=True)
+        rules = list(dict.fromkeys(h.rule_text for h in definitive))
+        phrases = list(dict.fromkeys(h.phrase for h in definitive))
+        # same shape as ComplianceCheckResponse.violations; violation_text() for flags / alerts
+        violations = list({
+            (h.rule_text, h.phrase): {"rule": h.rule_text, "phrase": h.phrase, "severity": h.severity}
+            for h in definitive
+        }.values())
+        return {
+            "compliant": False,
+            "violations": violations,
+            "severity": definitive[0].severity,
+            "suggestions": [f'Remove or substantiate the claim "{p}".' for p in phrases],
+            "confidence": 0.95,
+            "uses_context": False,
+            "top_rules": rules,
+            "score": 1.0,
+            "decision_path": DECISION_LEXICAL,
+        }
+
+def violation_text(violation: Any) -> str:
+    """One-line reason for flags / alerts: LLM violations are strings, lexical ones dicts."""
+    if isinstance(violation, dict):
+        return str(violation.get("rule") or violation.get("phrase") or "Policy violation")
+    return str(violation)
+
+_screen: Optional[LexicalScreen] = None
+
+def get_screen() -> LexicalScreen:
+    global _screen
+    if _screen is None:
+        _screen = LexicalScreen()
+    return _screen
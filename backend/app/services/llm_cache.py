@@ -0,0 +1,137 @@
+"""
+Content-addressed cache of chat completions for AIRouter.
+
+Keyed by SHA-256 over the request that determines the answer: model, temperature,
+response_format and messages. Two tiers:
+  - in-memory TTL-LRU bounded by bytes (utils/cache.py InMemoryCache)
+  - on-disk SQLite store shared by every worker process (survives restarts),
+    pruned by TTL and LLM_CACHE_MAX_DISK_ENTRIES
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ..config import settings
+from ..utils.cache import InMemoryCache
+
+log = logging.getLogger(__name__)
+
+_PRUNE_EVERY = 500  # disk writes between TTL / size prunes
+
+def request_key(request: Dict[str, Any]) -> str:
+    payload = {k: request.get(k) for k in ("model", "temperature", "response_format", "messages")}
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+class LLMResponseCache:
+    def __init__(self, path: Optional[str], ttl_s: float, max_memory_bytes: int, max_disk_entries: int):
+        self.ttl_s = ttl_s
+        self.max_disk_entries = max_disk_entries
+        self._mem = InMemoryCache(max_size=max(1, max_memory_bytes // 512), ttl=ttl_s, max_bytes=max_memory_bytes)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            try:
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute("PRAGMA busy_timeout=2000")  # other workers write the same file
+                self._db.execute("""
+                    CREATE TABLE IF NOT EXISTS responses (
+                        key TEXT PRIMARY KEY, content TEXT NOT NULL, expires_at REAL NOT NULL, created_at REAL NOT NULL
+                    )
+                """)
+                self._db.execute("CREATE INDEX IF NOT EXISTS idx_responses_created ON responses (created_at)")
+                self._db.commit()
+            except sqlite3.Error as e:
+                log.warning("LLM response disk cache disabled (%s): %s", path, e)
+                self._db = None
+        # counters (memory hits/misses live on the memory tier)
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    # ---------- disk tier ----------
+    def _disk_get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT content FROM responses WHERE key=? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def _disk_put(self, key: str, content: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses(key, content, expires_at, created_at) VALUES (?,?,?,?)",
+                (key, content, now + self.ttl_s, now),
+            )
+            self._writes += 1
+            if self._writes % _PRUNE_EVERY == 0:
+                self._db.execute(
+                    """DELETE FROM responses WHERE expires_at <= ?
+                       OR key IN (SELECT key FROM responses ORDER BY created_at DESC LIMIT -1 OFFSET ?)""",
+                    (now, self.max_disk_entries),
+                )
+            self._db.commit()
+
+    # ---------- public ----------
+    async def get(self, key: str) -> Optional[str]:
+        content = self._mem.get(key)
+        if content is not None:
+            return content
+        if self._db is not None:
+            try:
+                content = await asyncio.to_thread(self._disk_get, key)
+            except sqlite3.Error as e:
+                log.warning("LLM response disk cache read failed: %s", e)
+            if content is not None:
+                self.disk_hits += 1
+                self._mem.set(key, content)
+                return content
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, content: str) -> None:
+        self.stores += 1
+        self._mem.set(key, content)
+        if self._db is not None:
+            try:
+                await asyncio.to_thread(self._disk_put, key, content)
+            except sqlite3.Error as e:
+                log.warning("LLM response disk cache write failed: %s", e)
+
+    def stats(self) -> Dict[str, Any]:
+        mem = self._mem.stats()
+        lookups = mem["hits"] + self.disk_hits + self.misses
+        return {
+            "memory": mem,
+            "memory_hits": mem["hits"],
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_rate": ((mem["hits"] + self.disk_hits) / lookups) if lookups else 0.0,
+        }
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """One cache per process (None when LLM_CACHE is off); the disk file is shared by every process."""
+    global _cache
+    if not settings.LLM_CACHE:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMResponseCache(
+                settings.LLM_CACHE_PATH or None, ttl_s=settings.LLM_CACHE_TTL_S,
+                max_memory_bytes=settings.LLM_CACHE_MAX_BYTES, max_disk_entries=settings.LLM_CACHE_MAX_DISK_ENTRIES,
+            )
+        return _cache
@@ -0,0 +1,424 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+from uuid import UUID
+import asyncpg
+from typing import Any, Dict, List, Optional
+from app.config import settings
+from app.database import pool
+from app.services.agents.listings_agent import scan_many, scan_one
+from app.services.sweep_scheduler import SweepPolicy, schedule_sweep
+
+# Durable scan queue backed by the scan_jobs table (db/migrations/002_create_scan_jobs.sql).
+# Any API process can enqueue; any number of worker processes (scripts/worker.py) consume.
+
+log = logging.getLogger(__name__)
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+LANE_INTERACTIVE = "interactive"  # seller create/edit: someone is waiting on the verdict
+LANE_OFFICER = "officer"          # manual /recheck
+LANE_SWEEP = "sweep"              # periodic rescans
+LANES = (LANE_INTERACTIVE, LANE_OFFICER, LANE_SWEEP)  # highest priority first
+
+# Lower is more urgent; NULL (no lane yet) loses to any lane
+_RANK = "COALESCE(array_position(ARRAY[" + ",".join(f"'{l}'" for l in LANES) + "], {}), 99)"
+
+def _faster(a: str, b: str) -> str:
+    return f"CASE WHEN {_RANK.format(a)} < {_RANK.format(b)} THEN {a} ELSE {b} END"
+
+# Pending-set keyed by listing_id (uq_scan_jobs_pending_listing, migration 003):
+#   - listing already being scanned -> flag the running job for a rescan after completion
+#   - listing already pending       -> fold into that job (coalesced += 1), promoting it
+#                                      to the faster lane of the two
+#   - otherwise                     -> new pending job
+# Returns no row when folded into a running job, else the job's coalesced counter.
+ENQUEUE_SQL = f"""
+WITH running AS (
+    UPDATE scan_jobs SET rescan=TRUE, rescan_lane={_faster("$3", "rescan_lane")},
+                         rescan_requested_at = CASE WHEN {_RANK.format("$3")} < {_RANK.format("rescan_lane")}
+                                                    THEN NOW() ELSE rescan_requested_at END,
+                         coalesced=coalesced+1, updated_at=NOW()
+    WHERE listing_id=$1 AND status='running'
+    RETURNING id
+)
+INSERT INTO scan_jobs(listing_id, max_attempts, lane)
+SELECT $1, $2, $3 WHERE NOT EXISTS (SELECT 1 FROM running)
+ON CONFLICT (listing_id) WHERE status='pending'
+DO UPDATE SET coalesced = scan_jobs.coalesced + 1, updated_at=NOW(),
+              lane = {_faster("EXCLUDED.lane", "scan_jobs.lane")},
+              requested_at = CASE WHEN {_RANK.format("EXCLUDED.lane")} < {_RANK.format("scan_jobs.lane")}
+                                  THEN NOW() ELSE scan_jobs.requested_at END
+RETURNING coalesced
+"""
+
+# Claim up to $4 ready jobs from lane $3: pending and past their backoff, or running with
+# an expired lease. Never start a second concurrent scan of a listing that is still leased.
+LEASE_SQL = """
+UPDATE scan_jobs
+SET status='running', attempts=attempts+1, leased_by=$1,
+    leased_until=NOW() + make_interval(secs => $2), updated_at=NOW()
+WHERE id IN (
+    SELECT j.id FROM scan_jobs j
+    WHERE j.lane = $3
+      AND ((j.status='pending' AND j.run_after <= NOW())
+       OR (j.status='running' AND j.leased_until < NOW() AND j.attempts < j.max_attempts))
+      AND NOT EXISTS (
+          SELECT 1 FROM scan_jobs r
+          WHERE r.listing_id = j.listing_id AND r.id <> j.id
+            AND r.status='running' AND r.leased_until >= NOW()
+      )
+    ORDER BY j.run_after, j.id
+    FOR UPDATE SKIP LOCKED
+    LIMIT $4
+)
+RETURNING id, listing_id, lane, attempts, max_attempts
+"""
+
+# Re-enqueue (coalescing) when a recheck arrived while the job was running. One row per
+# listing: ON CONFLICT cannot touch the same pending row twice in a statement. The new
+# job keeps the time the recheck was requested, so it does not queue behind newer work.
+_REQUEUE_RESCAN = f"""
+INSERT INTO scan_jobs(listing_id, max_attempts, lane, requested_at, run_after)
+SELECT DISTINCT ON (listing_id) listing_id, max_attempts, COALESCE(rescan_lane, lane),
+       COALESCE(rescan_requested_at, NOW()), COALESCE(rescan_requested_at, NOW())
+FROM finished WHERE rescan
+ORDER BY listing_id, {_RANK.format("COALESCE(rescan_lane, lane)")}
+ON CONFLICT (listing_id) WHERE status='pending'
+DO UPDATE SET coalesced = scan_jobs.coalesced + 1, updated_at=NOW(),
+              lane = {_faster("EXCLUDED.lane", "scan_jobs.lane")},
+              requested_at = CASE WHEN {_RANK.format("EXCLUDED.lane")} < {_RANK.format("scan_jobs.lane")}
+                                  THEN EXCLUDED.requested_at
+                                  ELSE LEAST(EXCLUDED.requested_at, scan_jobs.requested_at) END
+"""
+
+# leased_by guard: a job whose lease expired may already belong to another worker
+COMPLETE_SQL = """
+WITH finished AS (
+    UPDATE scan_jobs
+    SET status='done', leased_until=NULL, finished_at=NOW(), updated_at=NOW()
+    WHERE id=$1 AND leased_by=$2
+    RETURNING listing_id, max_attempts, rescan, rescan_lane, rescan_requested_at, lane
+)
+""" + _REQUEUE_RESCAN
+
+# Exponential backoff, dead-lettered once attempts are exhausted. A retry already
+# covers a pending rescan; a dead job with a pending rescan gets a fresh job. If the
+# listing already has a pending job (enqueued in the READ COMMITTED window before this
+# one was leased) the retry folds into it, as ENQUEUE_SQL would, instead of violating
+# uq_scan_jobs_pending_listing.
+FAIL_SQL = f"""
+WITH pending AS (
+    SELECT p.id FROM scan_jobs p JOIN scan_jobs j ON j.listing_id = p.listing_id
+    WHERE j.id=$1 AND p.status='pending'
+    FOR UPDATE OF p
+),
+finished AS (
+    UPDATE scan_jobs
+    SET status = CASE WHEN attempts >= max_attempts THEN 'dead'
+                      WHEN EXISTS (SELECT 1 FROM pending) THEN 'done' ELSE 'pending' END,
+        rescan = CASE WHEN attempts >= max_attempts THEN rescan ELSE FALSE END,
+        lane = CASE WHEN attempts >= max_attempts THEN lane ELSE {_faster("rescan_lane", "lane")} END,
+        rescan_lane = CASE WHEN attempts >= max_attempts THEN rescan_lane ELSE NULL END,
+        rescan_requested_at = CASE WHEN attempts >= max_attempts THEN rescan_requested_at ELSE NULL END,
+        run_after = NOW() + make_interval(secs => LEAST($4, $3 * power(2, attempts - 1))),
+        leased_until=NULL, last_error=$5, updated_at=NOW(),
+        finished_at = CASE WHEN attempts >= max_attempts OR EXISTS (SELECT 1 FROM pending)
+                           THEN NOW() ELSE NULL END
+    WHERE id=$1 AND leased_by=$2
+    RETURNING listing_id, max_attempts, rescan, rescan_lane, rescan_requested_at, lane, status
+),
+folded AS (
+    UPDATE scan_jobs p
+    SET coalesced = p.coalesced + 1, updated_at=NOW(), lane = {_faster("f.lane", "p.lane")}
+    FROM finished f
+    WHERE p.id IN (SELECT id FROM pending) AND f.status='done'
+)
+""" + _REQUEUE_RESCAN
+
+# Workers that died mid-scan on their last attempt; a recheck flagged on the dead job
+# still gets its own job, as in FAIL_SQL
+REAP_SQL = """
+WITH finished AS (
+    UPDATE scan_jobs
+    SET status='dead', leased_until=NULL, finished_at=NOW(), updated_at=NOW(),
+        last_error=COALESCE(last_error, 'lease expired')
+    WHERE status='running' AND leased_until < NOW() AND attempts >= max_attempts
+    RETURNING listing_id, max_attempts, rescan, rescan_lane, rescan_requested_at, lane
+)
+""" + _REQUEUE_RESCAN
+
+# Drain: hand leases we could not finish back to the queue (not counted as an attempt),
+# folding into the listing's pending job when it already has one (see FAIL_SQL)
+RELEASE_SQL = f"""
+WITH pending AS (
+    SELECT id, listing_id FROM scan_jobs
+    WHERE status='pending'
+      AND listing_id IN (SELECT listing_id FROM scan_jobs WHERE status='running' AND leased_by=$1)
+    FOR UPDATE
+),
+released AS (
+    UPDATE scan_jobs
+    SET status = CASE WHEN listing_id IN (SELECT listing_id FROM pending) THEN 'done' ELSE 'pending' END,
+        finished_at = CASE WHEN listing_id IN (SELECT listing_id FROM pending) THEN NOW() ELSE NULL END,
+        attempts=GREATEST(attempts - 1, 0), leased_by=NULL, leased_until=NULL, updated_at=NOW()
+    WHERE status='running' AND leased_by=$1
+    RETURNING listing_id, {_faster("rescan_lane", "lane")} AS lane, status
+)
+UPDATE scan_jobs p
+SET coalesced = p.coalesced + 1, updated_at=NOW(), lane = {_faster("r.lane", "p.lane")}
+FROM released r
+WHERE p.id IN (SELECT id FROM pending) AND p.listing_id = r.listing_id AND r.status='done'
+"""
+
+class LanePicker:
+    """
+    Smooth weighted round-robin over the lanes (weights from SCAN_LANE_WEIGHTS): with
+    6/3/1 every 10 leases go 6 interactive, 3 officer, 1 sweep, interleaved rather
+    than in bursts. Work-conserving: an empty lane hands its turn to the next one.
+    """
+
+    def __init__(self, weights: Dict[str, int]):
+        self.weights = {lane: max(0, int(weights.get(lane, 0))) for lane in LANES}
+        self._current = {lane: 0 for lane in LANES}
+
+    def order(self) -> List[str]:
+        """Lanes to try for the next lease: this turn's lane first, then by priority."""
+        active = [lane for lane in LANES if self.weights[lane] > 0]
+        if not active:
+            return list(LANES)
+        for lane in active:
+            self._current[lane] += self.weights[lane]
+        pick = max(active, key=lambda lane: self._current[lane])
+        self._current[pick] -= sum(self.weights[lane] for lane in active)
+        return [pick] + [lane for lane in LANES if lane != pick]
+
+def _parse_lane_weights(spec: str) -> Dict[str, int]:
+    weights = {LANE_INTERACTIVE: 6, LANE_OFFICER: 3, LANE_SWEEP: 1}
+    for part in (spec or "").split(","):
+        lane, _, weight = part.partition("=")
+        if lane.strip() in weights and weight.strip().isdigit():
+            weights[lane.strip()] = int(weight)
+    return weights
+
+_lanes = LanePicker(_parse_lane_weights(settings.SCAN_LANE_WEIGHTS))
+
+_worker_started = False
+_stopping: Optional[asyncio.Event] = None
+_worker_tasks: List[asyncio.Task] = []
+_periodic_task: Optional[asyncio.Task] = None
+_stats: Dict[str, Any] = {
+    "started_at": None, "workers": 0, "busy": 0, "scans_ok": 0, "scans_failed": 0,
+    "enqueued": 0, "coalesced": 0, "leased_by_lane": {lane: 0 for lane in LANES},
+    "scan_s_avg": None, "last_sweep": None,
+}
+
+async def enqueue_recheck(listing_id: UUID, lane: str = LANE_INTERACTIVE) -> None:
+    if lane not in LANES:
+        raise ValueError(f"unknown scan lane: {lane}")
+    async with pool.acquire() as conn:
+        coalesced = await conn.fetchval(ENQUEUE_SQL, listing_id, settings.SCAN_MAX_ATTEMPTS, lane)
+    _stats["enqueued"] += 1
+    if coalesced is None or coalesced > 0:
+        _stats["coalesced"] += 1
+
+async def _lease_jobs() -> List[dict]:
+    # Interactive / officer jobs one at a time (lowest latency); sweeps in scan_many batches
+    lease_s = float(settings.SCAN_VISIBILITY_TIMEOUT_S)
+    async with pool.acquire() as conn:
+        for lane in _lanes.order():
+            limit = max(1, settings.SCAN_SWEEP_BATCH) if lane == LANE_SWEEP else 1
+            rows = await conn.fetch(LEASE_SQL, WORKER_ID, lease_s, lane, limit)
+            if rows:
+                _stats["leased_by_lane"][lane] += len(rows)
+                return [dict(r) for r in rows]
+    return []
+
+async def _complete_job(job: dict) -> None:
+    async with pool.acquire() as conn:
+        await conn.execute(COMPLETE_SQL, job["id"], WORKER_ID)
+
+async def _fail_job(job: dict, error: Exception) -> None:
+    async with pool.acquire() as conn:
+        try:
+            await _execute_fail(conn, job, error)
+        except asyncpg.UniqueViolationError:
+            # A pending job for the listing committed while FAIL_SQL ran; now it is visible
+            await _execute_fail(conn, job, error)
+
+async def _execute_fail(conn, job: dict, error: Exception) -> None:
+    await conn.execute(
+        FAIL_SQL, job["id"], WORKER_ID,
+        settings.SCAN_BACKOFF_BASE_S, settings.SCAN_BACKOFF_MAX_S, str(error)[:2000],
+    )
+
+async def _reap_expired() -> None:
+    async with pool.acquire() as conn:
+        await conn.execute(REAP_SQL)
+
+async def _idle(seconds: float) -> None:
+    # Sleep, but wake up immediately when a drain starts
+    try:
+        await asyncio.wait_for(_stopping.wait(), timeout=seconds)
+    except asyncio.TimeoutError:
+        pass
+
+async def _finish(worker_no: int, job: dict, error: Optional[Exception]) -> None:
+    if error is not None:
+        _stats["scans_failed"] += 1
+        log.warning("[queue:%d] error scanning %s (attempt %s/%s): %s",
+                    worker_no, job["listing_id"], job["attempts"], job["max_attempts"], error)
+        try:
+            await _fail_job(job, error)
+        except Exception as e2:
+            log.warning("[queue:%d] could not record failure of job %s: %s", worker_no, job["id"], e2)
+    else:
+        _stats["scans_ok"] += 1
+        try:
+            await _complete_job(job)
+        except Exception as e:
+            log.warning("[queue:%d] could not complete job %s: %s", worker_no, job["id"], e)
+
+async def _scan_jobs(worker_no: int, jobs: List[dict]) -> None:
+    if len(jobs) == 1:
+        try:
+            await scan_one(jobs[0]["listing_id"])
+        except Exception as e:
+            await _finish(worker_no, jobs[0], e)
+        else:
+            await _finish(worker_no, jobs[0], None)
+        return
+    try:
+        results = await scan_many([j["listing_id"] for j in jobs])
+    except Exception as e:
+        # nothing was persisted (single transaction): retry the whole batch
+        for job in jobs:
+            await _finish(worker_no, job, e)
+        return
+    for job in jobs:
+        res = results.get(job["listing_id"]) or {}
+        failed = res.get("error") == "scan_failed"
+        await _finish(worker_no, job, RuntimeError(res.get("detail") or "scan failed") if failed else None)
+
+async def _queue_worker(worker_no: int):
+    while not _stopping.is_set():
+        try:
+            jobs = await _lease_jobs()
+            if not jobs:
+                await _reap_expired()
+                await _idle(settings.SCAN_POLL_INTERVAL_S)
+                continue
+        except Exception as e:
+            log.warning("[queue:%d] lease failed: %s", worker_no, e)
+            await _idle(settings.SCAN_POLL_INTERVAL_S)
+            continue
+
+        # Leased jobs are always finished, even if a drain starts meanwhile
+        _stats["busy"] += len(jobs)
+        started = time.monotonic()
+        try:
+            await _scan_jobs(worker_no, jobs)
+        finally:
+            _stats["busy"] -= len(jobs)
+            _record_scan_time((time.monotonic() - started) / len(jobs))
+
+def _record_scan_time(seconds: float) -> None:
+    # EWMA of scan duration; sizes the sweep batches of this process
+    prev = _stats["scan_s_avg"]
+    _stats["scan_s_avg"] = seconds if prev is None else 0.9 * prev + 0.1 * seconds
+
+async def _periodic_scan(interval_seconds: Optional[float] = None):
+    interval_s = interval_seconds or settings.SWEEP_INTERVAL_S
+    policy = SweepPolicy.from_settings()
+    while True:
+        try:
+            async with pool.acquire() as conn:
+                _stats["last_sweep"] = await schedule_sweep(
+                    conn, policy, workers=_stats["workers"], busy=_stats["busy"],
+                    avg_scan_s=_stats["scan_s_avg"] or settings.SWEEP_EST_SCAN_S,
+                    lane=LANE_SWEEP, interval_s=interval_s,
+                )
+        except Exception as e:
+            log.warning("[scanner] error scheduling scans: %s", e)
+        await asyncio.sleep(interval_s)
+
+def queue_stats() -> Dict[str, Any]:
+    """In-process worker pool counters (DB-wide queue state lives in scan_jobs)."""
+    out = dict(_stats)
+    out["leased_by_lane"] = dict(_stats["leased_by_lane"])
+    if out["started_at"]:
+        elapsed_min = max((time.time() - out["started_at"]) / 60.0, 1e-9)
+        out["scans_per_min"] = (out["scans_ok"] + out["scans_failed"]) / elapsed_min
+    return out
+
+async def queue_metrics() -> Dict[str, Any]:
+    """Queue-wide state from scan_jobs (all processes) plus this process's counters."""
+    async with pool.acquire() as conn:
+        rows = await conn.fetch("""
+            SELECT status, COUNT(*) AS jobs, COALESCE(SUM(coalesced), 0) AS coalesced,
+                   COUNT(*) FILTER (WHERE rescan) AS rescans_pending
+            FROM scan_jobs GROUP BY status
+        """)
+        lane_rows = await conn.fetch("""
+            SELECT l.lane,
+                   (SELECT COUNT(*) FROM scan_jobs p WHERE p.lane = l.lane AND p.status = 'pending') AS pending,
+                   (SELECT EXTRACT(EPOCH FROM NOW() - MIN(p.requested_at)) FROM scan_jobs p
+                     WHERE p.lane = l.lane AND p.status = 'pending') AS oldest_pending_s,
+                   d.done, d.p50_s, d.p95_s
+            FROM unnest($1::text[]) AS l(lane)
+            LEFT JOIN LATERAL (
+                SELECT COUNT(*) AS done,
+                       percentile_cont(0.5)  WITHIN GROUP (ORDER BY EXTRACT(EPOCH FROM finished_at - requested_at)) AS p50_s,
+                       percentile_cont(0.95) WITHIN GROUP (ORDER BY EXTRACT(EPOCH FROM finished_at - requested_at)) AS p95_s
+                FROM scan_jobs
+                WHERE lane = l.lane AND status = 'done' AND finished_at > NOW() - make_interval(secs => $2)
+            ) d ON TRUE
+        """, list(LANES), float(settings.SCAN_METRICS_WINDOW_S))
+    by_status = {r["status"]: {"jobs": r["jobs"], "coalesced": r["coalesced"], "rescans_pending": r["rescans_pending"]} for r in rows}
+    # time-to-first-verdict per lane: request (or promotion) -> scan done, over the window
+    by_lane = {r["lane"]: {k: r[k] for k in ("pending", "oldest_pending_s", "done", "p50_s", "p95_s")} for r in lane_rows}
+    return {
+        "by_status": by_status,
+        "by_lane": by_lane,
+        "lane_weights": dict(_lanes.weights),
+        "coalesced_total": sum(v["coalesced"] for v in by_status.values()),
+        "process": queue_stats(),
+    }
+
+async def start_background_workers(num_workers: Optional[int] = None):
+    global _worker_started, _stopping, _periodic_task
+    if _worker_started: return
+    _worker_started = True
+    _stopping = asyncio.Event()
+    n = max(1, num_workers or settings.SCAN_WORKERS)
+    _stats.update(started_at=time.time(), workers=n)
+    # Scans are I/O bound (pgvector + LLM): N consumers per process; the LLM and per-table
+    # semaphores in AIRouter / ComplianceEngine keep the fan-out within rate limits.
+    _worker_tasks.extend(asyncio.create_task(_queue_worker(i)) for i in range(n))
+    _periodic_task = asyncio.create_task(_periodic_scan())
+
+async def stop_background_workers(timeout: Optional[float] = None) -> None:
+    """Graceful drain: stop leasing, let in-flight scans finish, release whatever is left."""
+    global _worker_started, _periodic_task
+    if not _worker_started: return
+    _stopping.set()
+    if _periodic_task is not None:
+        _periodic_task.cancel()
+        _periodic_task = None
+    _, still_running = await asyncio.wait(
+        _worker_tasks, timeout=timeout if timeout is not None else settings.SCAN_DRAIN_TIMEOUT_S
+    )
+    for t in still_running:
+        t.cancel()
+    if still_running:
+        await asyncio.gather(*still_running, return_exceptions=True)
+        log.warning("[queue] drain timed out; releasing %d in-flight scan(s)", len(still_running))
+        try:
+            async with pool.acquire() as conn:
+                await conn.execute(RELEASE_SQL, WORKER_ID)
+        except Exception as e:
+            log.warning("[queue] could not release leases: %s", e)
+    _worker_tasks.clear()
+    _worker_started = False
@@ -0,0 +1,123 @@
+"""
+Near-duplicate verdict cache for the /api/compliance/check* routes.
+
+Exact keys (services/verdict_cache.py) only hit on byte-identical text; listings
+repeat with a different color word or a trailing emoji. This cache keeps the
+query embedding of every computed verdict in a NumPy matrix per (route,
+check_type) partition and answers a new query with the closest previous verdict
+when cosine similarity >= SEMANTIC_CACHE_THRESHOLD. Partitions never mix, a
+regulation version change empties them, and every hit reports which query it
+came from and how similar it was.
+
+Embeddings are L2-normalized (ComplianceEngine._encode), so cosine = dot product.
+"""
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..config import settings
+
+_INITIAL_ROWS = 64
+
+class _Partition:
+    """Ring buffer of (embedding, verdict, provenance); oldest rows are overwritten at capacity."""
+
+    def __init__(self, dim: int, capacity: int, version: int):
+        self.capacity = capacity
+        self.version = version
+        self.vecs = np.zeros((min(_INITIAL_ROWS, capacity), dim), dtype=np.float32)
+        self.expires = np.full(len(self.vecs), -np.inf)
+        self.entries: List[Optional[Tuple[Dict[str, Any], Dict[str, Any]]]] = [None] * len(self.vecs)
+        self.size = 0
+        self.next = 0
+
+    def add(self, emb: np.ndarray, expires_at: float, verdict: Dict[str, Any], provenance: Dict[str, Any]) -> None:
+        if self.next == len(self.vecs) and len(self.vecs) < self.capacity:
+            rows = min(self.capacity, 2 * len(self.vecs))
+            self.vecs = np.vstack([self.vecs, np.zeros((rows - len(self.vecs), self.vecs.shape[1]), dtype=np.float32)])
+            self.expires = np.concatenate([self.expires, np.full(rows - len(self.expires), -np.inf)])
+            self.entries.extend([None] * (rows - len(self.entries)))
+        i = self.next % len(self.vecs)
+        self.vecs[i] = emb
+        self.expires[i] = expires_at
+        self.entries[i] = (verdict, provenance)
+        self.next = i + 1
+        self.size = max(self.size, self.next)
+
+    def nearest(self, emb: np.ndarray, now: float) -> Tuple[int, float]:
+        sims = self.vecs[:self.size] @ emb
+        sims[self.expires[:self.size] <= now] = -np.inf
+        i = int(np.argmax(sims))
+        return i, float(sims[i])
+
+class SemanticCache:
+    def __init__(self, threshold: float, max_entries: int, ttl_s: float):
+        self.threshold = threshold
+        self.max_entries = max(1, max_entries)
+        self.ttl_s = ttl_s
+        self._parts: Dict[Tuple[str, str], _Partition] = {}
+        self._lock = threading.Lock()
+        # counters
+        self.hits = 0
+        self.misses = 0
+
+    def _partition(self, route: str, check_type: Optional[str], version: int, dim: int) -> Optional[_Partition]:
+        part = self._parts.get((route, check_type or ""))
+        if part is not None and (part.version != version or part.vecs.shape[1] != dim):
+            # verdicts computed under other rules (or another embedding model) never answer
+            del self._parts[(route, check_type or "")]
+            part = None
+        return part
+
+    def lookup(
+        self, route: str, check_type: Optional[str], emb: np.ndarray, version: int
+    ) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """(verdict, provenance + similarity) of the closest previous query above threshold, else None."""
+        emb = np.asarray(emb, dtype=np.float32)
+        with self._lock:
+            part = self._partition(route, check_type, version, emb.shape[-1])
+            if part is None or part.size == 0:
+                self.misses += 1
+                return None
+            i, sim = part.nearest(emb, time.monotonic())
+            if sim < self.threshold:
+                self.misses += 1
+                return None
+            self.hits += 1
+            verdict, provenance = part.entries[i]
+        return verdict, {**provenance, "similarity": round(sim, 4)}
+
+    def add(
+        self, route: str, check_type: Optional[str], emb: np.ndarray, version: int,
+        verdict: Dict[str, Any], provenance: Dict[str, Any],
+    ) -> None:
+        emb = np.asarray(emb, dtype=np.float32)
+        with self._lock:
+            part = self._partition(route, check_type, version, emb.shape[-1])
+            if part is None:
+                part = self._parts[(route, check_type or "")] = _Partition(emb.shape[-1], self.max_entries, version)
+            part.add(emb, time.monotonic() + self.ttl_s, verdict, provenance)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "threshold": self.threshold,
+                "partitions": {f"{route}:{ct}": p.size for (route, ct), p in self._parts.items()},
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+_semantic_cache: Optional[SemanticCache] = None
+
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """None when SEMANTIC_CACHE is off."""
+    global _semantic_cache
+    if _semantic_cache is None and settings.SEMANTIC_CACHE:
+        _semantic_cache = SemanticCache(
+            settings.SEMANTIC_CACHE_THRESHOLD, settings.SEMANTIC_CACHE_MAX_ENTRIES, settings.SEMANTIC_CACHE_TTL_S
+        )
+    return _semantic_cache
@@ -0,0 +1,138 @@
+"""
+Adaptive periodic sweep: which listings to rescan, and how many at a time.
+
+Each listing is due at  last_checked_at + interval, where
+    interval = base hours for its last severity (SWEEP_SEVERITY_HOURS)
+             x category volatility factor     (SWEEP_CATEGORY_FACTORS)
+capped at SWEEP_MAX_HOURS. A listing last scanned before the newest row in
+regulation_loads is due at  load + interval x SWEEP_REGULATION_SPREAD  instead,
+so risky listings are re-evaluated against new rules first.
+
+The batch is sized from worker headroom over the next sweep interval minus the
+work already queued, and is skipped while earlier sweeps are still waiting.
+"""
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from app.config import settings
+
+log = logging.getLogger(__name__)
+
+# $1 severity hours (jsonb), $2 category factors (jsonb), $3 default hours, $4 max hours,
+# $5 smallest possible interval in seconds, $6 regulation spread, $7 max_attempts, $8 lane, $9 batch
+SWEEP_SQL = """
+WITH reg AS (SELECT MAX(loaded_at) AS loaded_at FROM regulation_loads),
+cand AS (
+    SELECT l.id, l.last_checked_at, reg.loaded_at,
+           LEAST($4::float8,
+                 COALESCE(($1::jsonb ->> lower(s.severity))::float8, $3::float8)
+                 * COALESCE(($2::jsonb ->> lower(l.category))::float8, 1.0)) AS interval_h
+    FROM listings l
+    CROSS JOIN reg
+    LEFT JOIN LATERAL (
+        SELECT c.severity FROM compliance_results c
+        WHERE c.listing_id = l.id
+        ORDER BY c.created_at DESC LIMIT 1
+    ) s ON TRUE
+    WHERE (l.last_checked_at IS NULL
+       OR l.last_checked_at < GREATEST(NOW() - make_interval(secs => $5),
+                                       (SELECT MAX(loaded_at) FROM regulation_loads)))
+      AND NOT EXISTS (
+          SELECT 1 FROM scan_jobs j
+          WHERE j.listing_id = l.id AND j.status IN ('pending', 'running')
+      )
+),
+due AS (
+    SELECT id, interval_h,
+           CASE WHEN last_checked_at IS NULL THEN '-infinity'::timestamptz
+                WHEN loaded_at > last_checked_at THEN LEAST(
+                    last_checked_at + make_interval(secs => interval_h * 3600),
+                    loaded_at + make_interval(secs => interval_h * 3600 * $6))
+                ELSE last_checked_at + make_interval(secs => interval_h * 3600)
+           END AS due_at
+    FROM cand
+)
+INSERT INTO scan_jobs(listing_id, max_attempts, lane)
+SELECT id, $7, $8 FROM due
+WHERE due_at <= NOW()
+-- never scanned first, then by how many intervals overdue (risky listings overdue sooner)
+ORDER BY CASE WHEN due_at = '-infinity' THEN 'Infinity'::float8
+              ELSE EXTRACT(EPOCH FROM NOW() - due_at)::float8 / (interval_h * 3600) END DESC
+LIMIT $9
+ON CONFLICT (listing_id) WHERE status='pending' DO NOTHING
+RETURNING listing_id
+"""
+
+# Work already queued (all lanes) and how long the oldest pending sweep has waited
+BACKLOG_SQL = """
+SELECT COUNT(*) AS pending,
+       EXTRACT(EPOCH FROM NOW() - MIN(requested_at) FILTER (WHERE lane = $1))::float8 AS sweep_lag_s
+FROM scan_jobs WHERE status = 'pending'
+"""
+
+def _parse_hours(spec: str) -> Dict[str, float]:
+    hours: Dict[str, float] = {}
+    for part in (spec or "").split(","):
+        key, _, value = part.partition("=")
+        try:
+            hours[key.strip().lower()] = float(value)
+        except ValueError:
+            continue
+    return hours
+
+def _parse_factors(spec: str) -> Dict[str, float]:
+    try:
+        raw = json.loads(spec or "{}")
+        return {str(k).lower(): float(v) for k, v in raw.items()}
+    except (ValueError, TypeError, AttributeError) as e:
+        log.warning("[sweep] ignoring SWEEP_CATEGORY_FACTORS: %s", e)
+        return {}
+
+class SweepPolicy:
+    def __init__(self, severity_hours: Dict[str, float], category_factors: Dict[str, float],
+                 default_hours: float, max_hours: float, regulation_spread: float):
+        self.severity_hours = severity_hours
+        self.category_factors = category_factors
+        self.default_hours = default_hours
+        self.max_hours = max_hours
+        self.regulation_spread = regulation_spread
+
+    @classmethod
+    def from_settings(cls) -> "SweepPolicy":
+        return cls(
+            _parse_hours(settings.SWEEP_SEVERITY_HOURS), _parse_factors(settings.SWEEP_CATEGORY_FACTORS),
+            settings.SWEEP_DEFAULT_HOURS, settings.SWEEP_MAX_HOURS, settings.SWEEP_REGULATION_SPREAD,
+        )
+
+    def min_interval_s(self) -> float:
+        # Lower bound for the candidate range scan on last_checked_at
+        base = min([self.default_hours, *self.severity_hours.values()])
+        factor = min([1.0, *self.category_factors.values()])
+        return max(0.0, min(self.max_hours, base * factor)) * 3600
+
+def plan_batch_size(workers: int, busy: int, avg_scan_s: float, pending: int,
+                    sweep_lag_s: Optional[float], interval_s: float) -> int:
+    """
+    Scans this process can take on before the next sweep, beyond what is in flight
+    and already queued. Zero while sweeps queued earlier are still waiting.
+    """
+    if sweep_lag_s is not None and sweep_lag_s > interval_s:
+        return 0
+    capacity = workers * interval_s / max(avg_scan_s, 0.1) * settings.SWEEP_TARGET_UTILIZATION
+    return max(0, min(settings.SWEEP_MAX_BATCH, int(capacity) - busy - pending))
+
+async def schedule_sweep(conn, policy: SweepPolicy, *, workers: int, busy: int, avg_scan_s: float,
+                         lane: str, interval_s: float) -> Dict[str, Any]:
+    backlog = await conn.fetchrow(BACKLOG_SQL, lane)
+    batch = plan_batch_size(workers, busy, avg_scan_s, backlog["pending"], backlog["sweep_lag_s"], interval_s)
+    enqueued = 0
+    if batch > 0:
+        rows = await conn.fetch(
+            SWEEP_SQL,
+            policy.severity_hours, policy.category_factors,
+            policy.default_hours, policy.max_hours, policy.min_interval_s(), policy.regulation_spread,
+            settings.SCAN_MAX_ATTEMPTS, lane, batch,
+        )
+        enqueued = len(rows)
+    return {"batch": batch, "enqueued": enqueued, "pending": backlog["pending"], "sweep_lag_s": backlog["sweep_lag_s"]}
@@ -0,0 +1,237 @@
+"""
+Compliance verdict cache shared across worker processes and restarts.
+
+Two tiers, both keyed by the route's cache key:
+  - local: the per-process InMemoryCache (utils/cache.py compliance_cache)
+  - shared: a VerdictStore every worker can see, selected by VERDICT_CACHE_BACKEND
+      "sqlite"   -> a SQLite file (single host, survives restarts)
+      "postgres" -> the UNLOGGED verdict_cache table (migration 008)
+      "none"     -> local tier only
+
+Every entry is tagged with the regulation dataset version (newest regulation_loads
+id), re-read every VERDICT_VERSION_REFRESH_S. After a reload, verdicts reached under
+the old rules stop matching and are pruned from the shared tier (versions only
+grow, so a worker that hasn't noticed a reload yet never prunes newer rows).
+Cache failures are logged and treated as misses.
+"""
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ..config import settings
+from ..database import pool
+from ..utils.cache import InMemoryCache, compliance_cache
+
+log = logging.getLogger(__name__)
+
+_PRUNE_EVERY = 200  # shared-tier writes between TTL / size prunes
+
+VERSION_SQL = "SELECT COALESCE(MAX(id), 0) FROM regulation_loads"
+
+class VerdictStore:
+    """Shared tier interface. Values are JSON-serializable dicts."""
+    name = "none"
+
+    async def get(self, key: str, version: int) -> Optional[Dict[str, Any]]:
+        return None
+
+    async def set(self, key: str, version: int, value: Dict[str, Any], ttl_s: float) -> None:
+        return None
+
+    async def prune(self, version: int) -> None:
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+class SqliteVerdictStore(VerdictStore):
+    name = "sqlite"
+
+    def __init__(self, path: str, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA busy_timeout=2000")  # other workers write the same file
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS verdicts (
+                key TEXT PRIMARY KEY, version INTEGER NOT NULL, value TEXT NOT NULL,
+                expires_at REAL NOT NULL, created_at REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_verdicts_created ON verdicts (created_at)")
+        self._db.commit()
+
+    def _get(self, key: str, version: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM verdicts WHERE key=? AND version=? AND expires_at > ?", (key, version, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _set(self, key: str, version: int, value: Dict[str, Any], ttl_s: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO verdicts(key, version, value, expires_at, created_at) VALUES (?,?,?,?,?)",
+                (key, version, json.dumps(value), now + ttl_s, now),
+            )
+            self._db.commit()
+
+    def _prune(self, version: int) -> None:
+        with self._lock:
+            self._db.execute(
+                """DELETE FROM verdicts WHERE expires_at <= ? OR version < ?
+                   OR key IN (SELECT key FROM verdicts ORDER BY created_at DESC LIMIT -1 OFFSET ?)""",
+                (time.time(), version, self.max_entries),
+            )
+            self._db.commit()
+
+    async def get(self, key: str, version: int) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._get, key, version)
+
+    async def set(self, key: str, version: int, value: Dict[str, Any], ttl_s: float) -> None:
+        await asyncio.to_thread(self._set, key, version, value, ttl_s)
+
+    async def prune(self, version: int) -> None:
+        await asyncio.to_thread(self._prune, version)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+        return {"backend": self.name, "entries": entries, "max_entries": self.max_entries}
+
+class PostgresVerdictStore(VerdictStore):
+    """UNLOGGED table on the app pool: no WAL cost, emptied by a crash (it is only a cache)."""
+    name = "postgres"
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+
+    async def get(self, key: str, version: int) -> Optional[Dict[str, Any]]:
+        async with pool.acquire() as conn:
+            return await conn.fetchval(
+                "SELECT value FROM verdict_cache WHERE key=$1 AND version=$2 AND expires_at > NOW()", key, version
+            )
+
+    async def set(self, key: str, version: int, value: Dict[str, Any], ttl_s: float) -> None:
+        async with pool.acquire() as conn:
+            await conn.execute("""
+                INSERT INTO verdict_cache(key, version, value, expires_at, created_at)
+                VALUES ($1, $2, $3::jsonb, NOW() + make_interval(secs => $4), NOW())
+                ON CONFLICT (key) DO UPDATE
+                SET version=EXCLUDED.version, value=EXCLUDED.value,
+                    expires_at=EXCLUDED.expires_at, created_at=EXCLUDED.created_at
+            """, key, version, value, ttl_s)
+
+    async def prune(self, version: int) -> None:
+        async with pool.acquire() as conn:
+            await conn.execute("""
+                DELETE FROM verdict_cache WHERE expires_at <= NOW() OR version < $1
+                   OR key IN (SELECT key FROM verdict_cache ORDER BY created_at DESC OFFSET $2)
+            """, version, self.max_entries)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "max_entries": self.max_entries}
+
+class TieredVerdictCache:
+    def __init__(self, local: InMemoryCache, shared: VerdictStore, ttl_s: float, version_refresh_s: float):
+        self.local = local
+        self.shared = shared
+        self.ttl_s = ttl_s
+        self.version_refresh_s = version_refresh_s
+        self.version = 0
+        self._version_at = float("-inf")
+        self._refreshing = False
+        self._writes = 0
+        # counters
+        self.shared_hits = 0
+        self.shared_errors = 0
+
+    @staticmethod
+    async def _read_version() -> int:
+        async with pool.acquire() as conn:
+            return int(await conn.fetchval(VERSION_SQL))
+
+    async def current_version(self) -> int:
+        """Regulation version to look up and store under (refreshed at most every version_refresh_s)."""
+        if self._refreshing or time.monotonic() - self._version_at < self.version_refresh_s:
+            return self.version
+        self._refreshing = True
+        try:
+            version = await asyncio.wait_for(self._read_version(), timeout=2)
+            if version != self.version:
+                log.info("[verdict_cache] regulation version %s -> %s", self.version, version)
+                self.version = version
+                self.local.clear()
+                await self._shared_call(self.shared.prune(version))
+        except Exception as e:
+            # e.g. sqlite dev DATABASE_URL: keep the last known version
+            log.debug("[verdict_cache] version refresh failed: %s", e)
+        finally:
+            self._version_at = time.monotonic()
+            self._refreshing = False
+        return self.version
+
+    async def _shared_call(self, coro):
+        try:
+            return await coro
+        except Exception as e:
+            self.shared_errors += 1
+            log.warning("[verdict_cache] %s tier error: %s", self.shared.name, e)
+            return None
+
+    async def get(self, key: str, version: int) -> Optional[Dict[str, Any]]:
+        local_key = f"{version}:{key}"
+        value = self.local.get(local_key)
+        if value is not None:
+            return value
+        value = await self._shared_call(self.shared.get(key, version))
+        if value is not None:
+            self.shared_hits += 1
+            self.local.set(local_key, value)
+        return value
+
+    async def set(self, key: str, version: int, value: Dict[str, Any]) -> None:
+        # `version` is the one the miss was looked up under: a verdict computed
+        # while a reload lands stays tagged with the old rules and never matches
+        self.local.set(f"{version}:{key}", value)
+        await self._shared_call(self.shared.set(key, version, value, self.ttl_s))
+        self._writes += 1
+        if self._writes % _PRUNE_EVERY == 0:
+            await self._shared_call(self.shared.prune(self.version))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "local": self.local.stats(),
+            "shared": {**self.shared.stats(), "hits": self.shared_hits, "errors": self.shared_errors},
+        }
+
+def _make_store() -> VerdictStore:
+    backend = settings.VERDICT_CACHE_BACKEND
+    try:
+        if backend == "sqlite" and settings.VERDICT_CACHE_PATH:
+            return SqliteVerdictStore(settings.VERDICT_CACHE_PATH, settings.VERDICT_CACHE_MAX_ENTRIES)
+        if backend == "postgres":
+            return PostgresVerdictStore(settings.VERDICT_CACHE_MAX_ENTRIES)
+    except sqlite3.Error as e:
+        log.warning("Verdict cache shared tier disabled (%s): %s", settings.VERDICT_CACHE_PATH, e)
+    return VerdictStore()
+
+_verdict_cache: Optional[TieredVerdictCache] = None
+
+def get_verdict_cache() -> TieredVerdictCache:
+    global _verdict_cache
+    if _verdict_cache is None:
+        _verdict_cache = TieredVerdictCache(
+            compliance_cache, _make_store(),
+            ttl_s=settings.VERDICT_CACHE_TTL_S, version_refresh_s=settings.VERDICT_VERSION_REFRESH_S,
+        )
+    return _verdict_cache
@@ -1,34 +1,209 @@
+import sys
+import threading
 import time
-from typing import Dict, Any, Optional
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Set
 from collections import OrderedDict
 
+from ..config import settings
+
+_ENTRY_OVERHEAD = 100  # approx. bytes per entry on top of the payload (key, bookkeeping)
+
+def approx_size(value: Any) -> int:
+    """Cheap payload size estimate used for the byte bound."""
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    nbytes = getattr(value, "nbytes", None)  # numpy arrays
+    if isinstance(nbytes, int):
+        return nbytes
+    dump = getattr(value, "model_dump_json", None)  # pydantic responses
+    if callable(dump):
+        return len(dump())
+    if isinstance(value, dict):
+        return sum(approx_size(k) + approx_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(approx_size(v) for v in value)
+    return sys.getsizeof(value)
+
+class _Entry:
+    __slots__ = ("value", "size", "expires_at", "tick")
+
+    def __init__(self, value: Any, size: int, expires_at: Optional[float], tick: Optional[int]):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.tick = tick
+
 class InMemoryCache:
-    def __init__(self, max_size: int = 100, ttl: int = 300):
-        self.cache = OrderedDict()
-        self.max_size = max_size
-        self.ttl = ttl  # Time to live in seconds
-    
+    """
+    Thread-safe TTL + LRU cache bounded by entry count and approximate bytes.
+
+    get/set/delete are O(1). Expired entries are dropped on read and also by a
+    background sweeper: a hashed timing wheel of `wheel_slots` buckets, advanced
+    every `sweep_interval` seconds, so dead entries don't hold capacity.
+    ttl=None means entries only leave by LRU eviction.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 100,
+        ttl: Optional[float] = 300,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable[[Any], int] = approx_size,
+        sweep_interval: float = 1.0,
+        wheel_slots: int = 512,
+    ):
+        self.max_size = max(1, int(max_size))
+        self.ttl = ttl  # Time to live in seconds (default per entry)
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._data: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # timing wheel: slot = tick % len(wheel); a slot holds keys expiring on that tick (any revolution)
+        self._tick_s = max(0.01, float(sweep_interval))
+        self._wheel: List[Set[str]] = [set() for _ in range(max(1, int(wheel_slots)))]
+        self._origin = time.monotonic()
+        self._swept_tick = 0
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        # counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    # ---------- internals (caller holds the lock) ----------
+    def _tick_of(self, t: float) -> int:
+        return int((t - self._origin) / self._tick_s)
+
+    def _remove(self, key: str) -> Optional[_Entry]:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+            if entry.tick is not None:
+                self._wheel[entry.tick % len(self._wheel)].discard(key)
+        return entry
+
+    def _evict_over_capacity(self) -> None:
+        while self._data and (
+            len(self._data) > self.max_size or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            key = next(iter(self._data))
+            self._remove(key)
+            self.evictions += 1
+
+    def _sweep_due(self, now: float) -> int:
+        expired = 0
+        current = self._tick_of(now)
+        # at most one revolution per call: every slot visited once is every slot
+        first = max(self._swept_tick, current - len(self._wheel) + 1)
+        for tick in range(first, current + 1):
+            bucket = self._wheel[tick % len(self._wheel)]
+            for key in [k for k in bucket if self._data[k].expires_at <= now]:
+                self._remove(key)
+                expired += 1
+        self._swept_tick = current + 1
+        self.expirations += expired
+        return expired
+
+    # ---------- background sweeper ----------
+    def _ensure_sweeper(self) -> None:
+        # caller holds the lock, so concurrent first set()s start one thread
+        if self._sweeper is not None:
+            return
+        ref = weakref.ref(self)  # the thread must not keep the cache alive
+        stop, tick_s = self._stop, self._tick_s
+
+        def run():
+            while not stop.wait(tick_s):
+                cache = ref()
+                if cache is None:
+                    return
+                cache.sweep()
+                del cache
+
+        self._sweeper = threading.Thread(target=run, name="cache-sweeper", daemon=True)
+        self._sweeper.start()
+
+    # ---------- public ----------
     def get(self, key: str) -> Optional[Any]:
-        if key in self.cache:
-            value, timestamp = self.cache[key]
-            if time.time() - timestamp < self.ttl:
-                # Move to end (most recently used)
-                self.cache.move_to_end(key)
-                return value
-            else:
-                # Expired
-                del self.cache[key]
-        return None
-    
-    def set(self, key: str, value: Any):
-        # Remove oldest if at capacity
-        if len(self.cache) >= self.max_size:
-            self.cache.popitem(last=False)
-        
-        self.cache[key] = (value, time.time())
-    
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            # Move to end (most recently used)
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        size = self._sizeof(value) + _ENTRY_OVERHEAD
+        if self.max_bytes is not None and size > self.max_bytes:
+            # would evict everything else and still not fit; drop the stale value it replaces
+            with self._lock:
+                self._remove(key)
+            return
+        expires_at = time.monotonic() + ttl if ttl else None  # None or 0: no expiry
+        tick = self._tick_of(expires_at) + 1 if expires_at is not None else None
+        with self._lock:
+            # Overwrite replaces in place: it must not evict some other key
+            self._remove(key)
+            self._data[key] = _Entry(value, size, expires_at, tick)
+            self._bytes += size
+            if tick is not None:
+                self._wheel[tick % len(self._wheel)].add(key)
+            self._evict_over_capacity()
+            if expires_at is not None:
+                self._ensure_sweeper()
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._remove(key) is not None
+
+    def sweep(self) -> int:
+        """Drop expired entries whose wheel slots are due; returns how many."""
+        with self._lock:
+            return self._sweep_due(time.monotonic())
+
     def clear(self):
-        self.cache.clear()
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            for bucket in self._wheel:
+                bucket.clear()
+
+    def close(self) -> None:
+        self._stop.set()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_size": self.max_size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
 
 # Global cache instance
-compliance_cache = InMemoryCache(max_size=500, ttl=600)
\ No newline at end of file
+compliance_cache = InMemoryCache(
+    max_size=settings.COMPLIANCE_CACHE_SIZE,
+    ttl=settings.COMPLIANCE_CACHE_TTL_S,
+    max_bytes=settings.COMPLIANCE_CACHE_MAX_BYTES,
+)
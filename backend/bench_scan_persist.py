@@ -0,0 +1,133 @@
+# backend/bench_scan_persist.py
+"""
+Round trips / pool acquisitions of scan_one's persistence: legacy vs. single statement.
+
+  python bench_scan_persist.py            # counts only (recording fake pool)
+  DATABASE_URL=postgresql://... python bench_scan_persist.py   # + timings, rolled back
+
+The LLM part of a scan is identical in both paths and not exercised here.
+"""
+import asyncio
+import os
+import time
+from uuid import uuid4
+
+from dotenv import load_dotenv
+
+from app.database import _init_connection
+from app.services.agents.listings_agent import _flag_for, _result_params, persist_result
+
+load_dotenv()
+
+N_ITER = 200
+
+RESULT = {
+    "compliant": False, "severity": "high", "confidence": 0.9, "uses_context": True,
+    "violations": ["Products cannot claim FDA approved without actual FDA approval"],
+    "suggestions": ["Remove the claim."], "top_rules": ["Products cannot claim FDA approved ..."],
+    "agent_summaries": [{"name": "FDA_Drug_Agent", "score": 0.71}],
+}
+CLEAN = {**RESULT, "compliant": True, "severity": "low", "violations": []}
+
+# ---------- legacy reference (scan_one before single-statement persistence) ----------
+async def legacy_persist(pool, listing_id, result):
+    async with pool.acquire() as conn:
+        await conn.execute("""
+            INSERT INTO compliance_results(
+                id, listing_id, route, compliant, severity, confidence, uses_context, score,
+                violations, suggestions, top_rules, agent_summaries, created_at
+            ) VALUES ($1,$2,$3,$4,$5,$6,$7,$8,$9::jsonb,$10::jsonb,$11::jsonb,$12::jsonb,NOW())
+        """, *_result_params(listing_id, result))
+        await conn.execute("UPDATE listings SET last_checked_at=NOW() WHERE id=$1", listing_id)
+    flag = _flag_for(result)
+    if flag:
+        async with pool.acquire() as conn:
+            await conn.execute("""
+                INSERT INTO flags(id, listing_id, severity, reason, created_at)
+                VALUES($1,$2,$3,$4,NOW())
+            """, uuid4(), listing_id, *flag)
+            await conn.execute("UPDATE listings SET status='Flagged', updated_at=NOW() WHERE id=$1", listing_id)
+
+async def new_persist(pool, listing_id, result):
+    async with pool.acquire() as conn:
+        await persist_result(conn, listing_id, result)
+
+# ---------- counting ----------
+class CountingConn:
+    def __init__(self, conn=None):
+        self.conn, self.round_trips = conn, 0
+
+    def __getattr__(self, name):
+        target = getattr(self.conn, name, None)
+        if name not in ("execute", "fetch", "fetchrow", "fetchval", "executemany"):
+            return target
+        async def call(*args, **kwargs):
+            self.round_trips += 1
+            return await target(*args, **kwargs) if target else None
+        return call
+
+class CountingPool:
+    """Hands out the same connection (real or fake); counts acquire() and statements."""
+    def __init__(self, conn=None):
+        self.counting = CountingConn(conn)
+        self.acquires = 0
+
+    def acquire(self):
+        pool = self
+        class _Ctx:
+            async def __aenter__(self):
+                pool.acquires += 1
+                return pool.counting
+            async def __aexit__(self, *exc):
+                return False
+        return _Ctx()
+
+async def count(fn, result):
+    pool = CountingPool()
+    await fn(pool, uuid4(), result)
+    return pool.acquires, pool.counting.round_trips
+
+async def bench_db(dsn: str):
+    import asyncpg
+    conn = await asyncpg.connect(dsn)
+    await _init_connection(conn)  # jsonb codec, as on the app pool
+    tx = conn.transaction()
+    await tx.start()
+    try:
+        listing_id = uuid4()
+        await conn.execute("""
+            INSERT INTO listings(id, seller_id, title, description, category, price, inventory, image_url,
+                                 status, last_checked_at, created_at, updated_at)
+            VALUES($1,'bench','bench listing','',NULL,0,0,NULL,'Active',NULL,NOW(),NOW())
+        """, listing_id)
+        pool = CountingPool(conn)
+        for label, fn in (("legacy (3 statements + flag pair)", legacy_persist), ("single CTE statement", new_persist)):
+            for result in (RESULT, CLEAN):
+                await fn(pool, listing_id, result)  # warm statement cache
+            start = time.perf_counter()
+            for i in range(N_ITER):
+                await fn(pool, listing_id, RESULT if i % 2 else CLEAN)
+            per_ms = (time.perf_counter() - start) / N_ITER * 1000
+            print(f"  {label:<36} {per_ms:8.3f} ms/scan")
+    finally:
+        await tx.rollback()
+        await conn.close()
+
+def main():
+    print("\n🧪 Persistence per scan (acquires / statements)")
+    for label, result in (("clean result", CLEAN), ("flagged result", RESULT)):
+        legacy = asyncio.run(count(legacy_persist, result))
+        new = asyncio.run(count(new_persist, result))
+        print(f"  {label:<16} legacy: {legacy[0]} acquire(s), {legacy[1]} round trips"
+              f"  →  new: {new[0]} acquire(s), {new[1]} round trip(s)")
+    print("  (+1 acquire / round trip for the listing read, unchanged)")
+
+    dsn = os.getenv("DATABASE_URL", "")
+    if dsn.startswith("postgres"):
+        print(f"\n🧪 Server timings ({N_ITER} scans each, rolled back)")
+        asyncio.run(bench_db(dsn))
+    else:
+        print("\n(set DATABASE_URL=postgresql://... to include server timings)")
+
+if __name__ == "__main__":
+    main()
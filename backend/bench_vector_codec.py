@@ -0,0 +1,92 @@
+# backend/bench_vector_codec.py
+"""
+Microbenchmark: pgvector text literals vs. the binary codec.
+
+  python bench_vector_codec.py            # client-side encoding only
+  DATABASE_URL=postgresql://... python bench_vector_codec.py   # + server round trips
+"""
+import asyncio
+import os
+import time
+
+import numpy as np
+from dotenv import load_dotenv
+
+try:  # pgvector >= 0.3
+    from pgvector import Vector
+
+    def to_db_binary(vec) -> bytes:
+        return Vector(vec).to_binary()
+except ImportError:
+    try:  # pgvector < 0.3
+        from pgvector.utils import to_db_binary
+    except ImportError:
+        raise SystemExit("bench_vector_codec.py needs pgvector (pip install 'pgvector>=0.3')")
+
+load_dotenv()
+
+DIM = 384
+N_VECTORS = 2000
+N_QUERIES = 300
+
+def text_literal(vec) -> str:
+    # What ComplianceEngine._vector_literal used to build for every query
+    return "[" + ",".join(f"{x:.6f}" for x in vec) + "]"
+
+def ingest_literal(vec) -> str:
+    # What load_all_datasets_to_neon.format_embedding used to build for every row
+    return "[" + ",".join(map(str, vec.tolist())) + "]"
+
+def bench(label: str, fn, vectors) -> float:
+    start = time.perf_counter()
+    for v in vectors:
+        fn(v)
+    per_call_us = (time.perf_counter() - start) / len(vectors) * 1e6
+    print(f"  {label:<32} {per_call_us:9.1f} µs/vector")
+    return per_call_us
+
+async def bench_round_trips(dsn: str, vectors) -> None:
+    import asyncpg
+    from pgvector.asyncpg import register_vector
+
+    text_conn = await asyncpg.connect(dsn)
+    bin_conn = await asyncpg.connect(dsn)
+    await register_vector(bin_conn)
+    sql = "SELECT vector_dims($1::vector)"
+    try:
+        for label, conn, arg in (
+            ("text literal + ::vector parse", text_conn, text_literal),
+            ("binary codec (numpy)", bin_conn, lambda v: v),
+        ):
+            await conn.fetchval(sql, arg(vectors[0]))  # warm statement cache
+            start = time.perf_counter()
+            for v in vectors[:N_QUERIES]:
+                await conn.fetchval(sql, arg(v))
+            per_query_ms = (time.perf_counter() - start) / N_QUERIES * 1000
+            print(f"  {label:<32} {per_query_ms:9.3f} ms/query")
+    finally:
+        await text_conn.close()
+        await bin_conn.close()
+
+def main():
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((N_VECTORS, DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    print(f"\n🧪 Client-side encoding ({N_VECTORS} x {DIM}-d vectors)")
+    query_txt = bench("query: f'{x:.6f}' literal", text_literal, vectors)
+    ingest_txt = bench("ingest: str(x) literal", ingest_literal, vectors)
+    binary = bench("binary codec (to_db_binary)", to_db_binary, vectors)
+    print(f"  → binary is {query_txt / binary:.1f}x faster than the query literal, "
+          f"{ingest_txt / binary:.1f}x faster than the ingest literal")
+    print(f"  payload: text ≈ {len(text_literal(vectors[0]))} bytes, binary = {len(to_db_binary(vectors[0]))} bytes")
+
+    dsn = os.getenv("DATABASE_URL", "")
+    if dsn.startswith("postgres"):
+        print(f"\n🧪 Server round trips ({N_QUERIES} queries each)")
+        asyncio.run(bench_round_trips(dsn, vectors))
+    else:
+        print("\n(set DATABASE_URL=postgresql://... to include server-side parse/round-trip timings)")
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,29 @@
 import json
 import asyncio
 import asyncpg
+from pgvector.asyncpg import register_vector
 from sentence_transformers import SentenceTransformer
 import os
 from datetime import datetime
 
-model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+from app.services.embedding_cache import get_embedding_cache
+
+EMB_MODEL = 'sentence-transformers/all-MiniLM-L6-v2'
+model = SentenceTransformer(EMB_MODEL)
+# Shared with the API: re-running ingestion skips records whose text was already encoded
+embedding_cache = get_embedding_cache(EMB_MODEL)
 
 class ComprehensiveDataLoader:
     def __init__(self):
         self.DATABASE_URL = os.getenv('DATABASE_URL')
         self.stats = {}
     
-    def format_embedding(self, text):
-        """Convert text to pgvector-compatible embedding string"""
-        embedding_list = model.encode(text[:1000]).tolist()
-        return '[' + ','.join(map(str, embedding_list)) + ']'
+    def encode_embedding(self, text):
+        """Encode text as a float32 vector (sent with pgvector's binary codec)"""
+        # Normalized like ComplianceEngine._encode: the cache entries are shared with the API
+        return embedding_cache.encode_many(
+            [text[:1000]], lambda texts: model.encode(texts, normalize_embeddings=True)
+        )[0]
     
     def truncate(self, text, length):
         """Safely truncate text to specified length"""
@@ -50,7 +58,7 @@ class ComprehensiveDataLoader:
                 is_electronic = any(term in product_text for term in 
                     ['battery', 'charger', 'electronic', 'computer', 'phone', 'power', 'electrical', 'cord'])
                 
-                embedding = self.format_embedding(text)
+                embedding = self.encode_embedding(text)
                 
                 # Get manufacturer name safely
                 manufacturer = 'Unknown'
@@ -128,7 +136,7 @@ class ComprehensiveDataLoader:
             for item in results[:2000]:  # Load 2000 drug enforcements
                 if isinstance(item, dict):
                     text = f"FDA Drug Recall: {item.get('product_description', '')}. Reason: {item.get('reason_for_recall', '')}. Classification: {item.get('classification', '')}"
-                    embedding = self.format_embedding(text)
+                    embedding = self.encode_embedding(text)
                     
                     try:
                         await conn.execute('''
@@ -186,7 +194,7 @@ class ComprehensiveDataLoader:
                         if allergen in reason.lower():
                             allergens.append(allergen)
                     
-                    embedding = self.format_embedding(text)
+                    embedding = self.encode_embedding(text)
                     
                     try:
                         await conn.execute('''
@@ -241,7 +249,7 @@ class ComprehensiveDataLoader:
             for item in results[:1500]:  # Limit due to file size
                 if isinstance(item, dict):
                     text = f"Medical Device Recall: {item.get('product_description', '')}. Reason: {item.get('reason_for_recall', '')}"
-                    embedding = self.format_embedding(text)
+                    embedding = self.encode_embedding(text)
                     
                     # Determine if it's also electronic
                     is_electronic = any(term in text.lower() for term in 
@@ -305,7 +313,7 @@ class ComprehensiveDataLoader:
             for item in results[:1000]:
                 if isinstance(item, dict):
                     text = f"Device Classification: {item.get('device_name', '')}. Class {item.get('device_class', '')}. {item.get('definition', '')}"
-                    embedding = self.format_embedding(text)
+                    embedding = self.encode_embedding(text)
                     
                     try:
                         await conn.execute('''
@@ -369,7 +377,7 @@ class ComprehensiveDataLoader:
                             warnings = warnings_list[0]
                     
                     text = f"Drug Label for {brand}: {warnings}"
-                    embedding = self.format_embedding(text)
+                    embedding = self.encode_embedding(text)
                     
                     try:
                         await conn.execute('''
@@ -415,7 +423,7 @@ class ComprehensiveDataLoader:
         
         for query_text, table_name in test_queries:
             try:
-                embedding = self.format_embedding(query_text)
+                embedding = self.encode_embedding(query_text)
                 
                 results = await conn.fetch(f'''
                     SELECT rule_text, 1 - (embedding <=> $1::vector) as similarity
@@ -430,6 +438,16 @@ class ComprehensiveDataLoader:
             except Exception as e:
                 print(f"  ⚠️ Could not test {table_name}: {str(e)[:50]}")
 
+    async def record_regulation_load(self, conn):
+        """Record this ingestion in regulation_loads (drives the adaptive sweep)"""
+        try:
+            await conn.execute(
+                "INSERT INTO regulation_loads(source, rows_loaded) VALUES ($1, $2)",
+                'load_all_datasets_to_neon', sum(self.stats.values())
+            )
+        except Exception as e:
+            print(f"  ⚠️ Could not record regulation load: {str(e)[:80]}")
+
     async def print_summary(self, conn):
         """Print summary statistics"""
         print("\n" + "="*50)
@@ -465,6 +483,7 @@ async def main():
     print("  Connecting to Neon database...")
     
     conn = await asyncpg.connect(loader.DATABASE_URL)
+    await register_vector(conn)
     
     try:
         # Load ALL 6 datasets
@@ -474,6 +493,9 @@ async def main():
         await loader.load_fda_device_data(conn)                 # Dataset 4 & 5: FDA Device (recall + classification)
         await loader.load_fda_drug_labels(conn)                 # Dataset 6: FDA Drug Labels
         
+        # Listings scanned before this load become due for an early rescan
+        await loader.record_regulation_load(conn)
+        
         # Test similarity search
         await loader.test_similarity_search(conn)
         